@@ -254,3 +254,6 @@ for member in dir(re):
 
 print(sorted(find_members))
 """
+
+# member_index.py keeps the members of modules in an on-disk cache and finds names like these without importing or
+# scanning the modules again.
@@ -0,0 +1,321 @@
+# Member index;
+# The exercise at the end of day2.py imports re and walks through dir(re) to find the members whose name contains
+# "find". Doing that for hundreds of modules whenever a program starts means importing all of them and scanning every
+# name again each time. module_index(name) looks at a module once, notes the name, kind and signature of every member
+# and keeps that in a small JSON file. The next time, the file is used as long as the module's source file is the
+# same: same modification time and size, or, if those changed, still the same SHA-256 hash. The module itself is not
+# even imported when its members come from the cache.
+#
+#     print(module_index('re').substring('find'))       # ['findall', 'finditer']
+#     print(module_index('re').prefix('sub'))           # ['sub', 'subn']
+#
+# Substring queries go through an index of the n-grams (pieces of GRAM letters) of every name: only the names that
+# contain all the n-grams of the query are checked. Prefix queries use binary search on the sorted names.
+# modules_index(names) puts the members of many modules in one such index and answers with {module: [names]}.
+# The cache only looks at the module's own file; a package whose __init__.py imports names from changed submodules
+# needs clear_cache().
+
+import bisect
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+GRAM = 3
+
+CACHE_DIR = os.environ.get('MEMBER_INDEX_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'member_index'))
+
+# Bumped when the layout of the cache files changes, so old files are not used.
+CACHE_VERSION = 1
+
+
+def member_kind(member):
+    if inspect.ismodule(member):
+        return 'module'
+    if inspect.isclass(member):
+        return 'class'
+    if inspect.isfunction(member):
+        return 'function'
+    if inspect.isbuiltin(member):
+        return 'builtin'
+    if callable(member):
+        return 'callable'
+    return 'data'
+
+
+def member_signature(member):
+    try:
+        return str(inspect.signature(member))
+    except (TypeError, ValueError):
+        return None
+
+
+# {name: [kind, signature]} for every member of the module, as dir() lists them.
+
+def inspect_module(module):
+    entries = {}
+    for name in dir(module):
+        try:
+            member = getattr(module, name)
+        except AttributeError:
+            continue
+        kind = member_kind(member)
+        entries[name] = [kind, member_signature(member) if kind != 'module' and callable(member) else None]
+    return entries
+
+
+# Positions of the sorted names that contain a text, or start with it.
+
+class NameSearch:
+    def __init__(self, names):
+        self.names = names
+        self.grams = None
+
+    def build_grams(self):
+        # Every piece of up to GRAM letters -> numbers of the names it appears in, so queries shorter than GRAM
+        # letters can be looked up directly
+        grams = {}
+        for number, name in enumerate(self.names):
+            pieces = {name[start:start + size] for size in range(1, GRAM + 1) for start in range(len(name) - size + 1)}
+            for piece in pieces:
+                grams.setdefault(piece, set()).add(number)
+        self.grams = grams
+
+    def substring(self, text):
+        if not text:
+            return range(len(self.names))
+        if self.grams is None:
+            self.build_grams()
+        pieces = {text[start:start + GRAM] for start in range(max(1, len(text) - GRAM + 1))}
+        postings = sorted((self.grams.get(piece, set()) for piece in pieces), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        # All n-grams present does not mean the whole text is (for texts longer than GRAM), so check
+        names = self.names
+        return [number for number in sorted(candidates) if text in names[number]]
+
+    def prefix(self, text):
+        return range(bisect.bisect_left(self.names, text), bisect.bisect_left(self.names, text + '\U0010ffff'))
+
+
+class MemberIndex:
+    def __init__(self, module, entries):
+        self.module = module
+        self.entries = entries
+        self.names = sorted(entries)
+        self.search = NameSearch(self.names)
+
+    def kind(self, name):
+        return self.entries[name][0]
+
+    def signature(self, name):
+        return self.entries[name][1]
+
+    def substring(self, text):
+        return [self.names[number] for number in self.search.substring(text)]
+
+    def prefix(self, text):
+        return [self.names[number] for number in self.search.prefix(text)]
+
+
+# The members of many modules in one index, so a query looks at the n-grams once instead of once per module.
+# Queries give {module: [names]}.
+
+class ModulesIndex:
+    def __init__(self, indexes):
+        self.indexes = {index.module: index for index in indexes}
+        self.members = sorted((name, index.module) for index in indexes for name in index.names)
+        self.search = NameSearch([name for name, module in self.members])
+
+    def collect(self, numbers):
+        found = {}
+        for number in numbers:
+            name, module = self.members[number]
+            found.setdefault(module, []).append(name)
+        return found
+
+    def substring(self, text):
+        return self.collect(self.search.substring(text))
+
+    def prefix(self, text):
+        return self.collect(self.search.prefix(text))
+
+
+# Where the module's code lives, without importing it (for a.b.c the packages a and a.b are imported). None for
+# modules built into the interpreter, whose members can only change with the interpreter itself.
+
+def module_file(name):
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError("No module named %r" % name, name=name)
+    if spec.origin in (None, 'built-in', 'frozen') or not os.path.isfile(spec.origin):
+        return None
+    return spec.origin
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(name, cache_dir):
+    return os.path.join(cache_dir, name + '.json')
+
+
+def source_stamp(path):
+    if path is None:
+        return {'file': None, 'python': sys.version}
+    stat = os.stat(path)
+    return {'file': path, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'python': sys.version}
+
+
+# A cache file in the layout write_cache makes, with an entry of [kind, signature] for every member.
+
+def valid_cache(cached):
+    return (isinstance(cached, dict) and cached.get('version') == CACHE_VERSION
+            and isinstance(cached.get('stamp'), dict) and isinstance(cached.get('entries'), dict)
+            and all(isinstance(entry, list) and len(entry) == 2 for entry in cached['entries'].values()))
+
+
+def read_cache(name, path, cache_dir):
+    try:
+        with open(cache_path(name, cache_dir)) as file:
+            cached = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not valid_cache(cached):
+        return None  # written by something else; rebuilt from the module
+    stamp = source_stamp(path)
+    if cached['stamp'].get('file') != stamp['file'] or cached['stamp'].get('python') != stamp['python']:
+        return None
+    if path is not None and cached['stamp'] != stamp:
+        # Touched, or copied over: only the contents count
+        if cached.get('sha256') != file_hash(path):
+            return None
+        cached['stamp'] = stamp
+        write_cache(name, cached, cache_dir)
+    return cached['entries']
+
+
+def write_cache(name, cached, cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Written next to the final file and renamed, so a reader never sees half a file
+    descriptor, temporary = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(cached, file)
+        os.replace(temporary, cache_path(name, cache_dir))
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def module_index(name, cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    path = module_file(name)
+    entries = read_cache(name, path, cache_dir)
+    if entries is None:
+        entries = inspect_module(importlib.import_module(name))
+        cached = {'version': CACHE_VERSION, 'stamp': source_stamp(path),
+                  'sha256': file_hash(path) if path else None, 'entries': entries}
+        write_cache(name, cached, cache_dir)
+    return MemberIndex(name, entries)
+
+
+def modules_index(names, cache_dir=None):
+    return ModulesIndex([module_index(name, cache_dir) for name in names])
+
+
+def clear_cache(cache_dir=None):
+    shutil.rmtree(cache_dir or CACHE_DIR, ignore_errors=True)
+
+
+# Usage;
+
+"""
+find_members = module_index('re').substring('find')
+print(find_members)
+
+index = module_index('json')
+for name in index.prefix('load'):
+    print(name, index.kind(name), index.signature(name))
+
+print(modules_index(['re', 'os', 'glob']).substring('find'))
+"""
+
+
+# Benchmark;
+# Start-up of a fresh interpreter that looks for "find" in the members of MODULES: importing every module and scanning
+# dir() as in day2.py, modules_index with an empty cache (cold) and with the cache filled (warm). Then the time of
+# substring queries over all those modules, with the n-gram index and with a scan of every name.
+
+MODULES = ['abc', 'argparse', 'ast', 'asyncio', 'base64', 'bisect', 'calendar', 'collections', 'concurrent.futures',
+           'contextlib', 'copy', 'csv', 'dataclasses', 'datetime', 'decimal', 'difflib', 'email', 'enum',
+           'fractions', 'functools', 'glob', 'gzip', 'hashlib', 'heapq', 'html', 'http.client', 'inspect', 'io',
+           'ipaddress', 'itertools', 'json', 'logging', 'lzma', 'math', 'mimetypes', 'multiprocessing', 'operator',
+           'os', 'pathlib', 'pickle', 'platform', 'pprint', 'queue', 'random', 're', 'secrets', 'selectors',
+           'shlex', 'shutil', 'signal', 'socket', 'sqlite3', 'ssl', 'statistics', 'string', 'struct', 'subprocess',
+           'sys', 'tarfile', 'tempfile', 'textwrap', 'threading', 'time', 'timeit', 'tokenize', 'traceback',
+           'types', 'typing', 'unittest', 'urllib.parse', 'urllib.request', 'uuid', 'warnings', 'weakref',
+           'xml.etree.ElementTree', 'zipfile', 'zlib']
+
+SCAN = """
+import importlib
+for name in %r:
+    [member for member in dir(importlib.import_module(name)) if "find" in member]
+"""
+
+INDEXED = """
+import sys
+sys.path.insert(0, %r)
+from member_index import modules_index
+modules_index(%r, %r).substring("find")
+"""
+
+
+def startup(code):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True)
+    return time.perf_counter() - start
+
+
+def benchmark(queries=('find', 'get', 'load', 'x', 'error', 'Path', 'parse_')):
+    here = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        indexed = INDEXED % (here, MODULES, cache_dir)
+        print("start-up with %d modules" % len(MODULES))
+        print("%-24s %8.3f s" % ("import and scan dir()", startup(SCAN % MODULES)))
+        print("%-24s %8.3f s" % ("modules_index, cold", startup(indexed)))
+        print("%-24s %8.3f s" % ("modules_index, warm", startup(indexed)))
+
+        index = modules_index(MODULES, cache_dir)
+        index.search.build_grams()
+
+        def scan(text):
+            found = {}
+            for name, module in index.members:
+                if text in name:
+                    found.setdefault(module, []).append(name)
+            return found
+
+        print("%d members" % len(index.members))
+        print("%-24s %12s" % ("query (all modules)", "us / query"))
+        for label, query in (('n-gram index', index.substring), ('scan', scan)):
+            start = time.perf_counter()
+            for _ in range(20):
+                results = [query(text) for text in queries]
+            print("%-24s %12.1f" % (label, (time.perf_counter() - start) / 20 / len(queries) * 1e6))
+            assert results == [scan(text) for text in queries]
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,229 @@
+# Zero-copy array transport;
+# Sending a NumPy array through a multiprocessing pipe pickles it (one copy), pushes the bytes through the pipe (another
+# copy on each side) and unpickles it into a new array (one more). With pickle protocol 5, the big buffers of an
+# object are handed to a callback instead of being copied into the pickle stream. Here each such buffer is placed in
+# a multiprocessing.shared_memory segment, and only the small pickle stream plus the segment names go through the pipe.
+# The receiver rebuilds the arrays as views on the shared memory itself.
+# Arrays created with shared_array() already live in shared memory, so sending them copies nothing at all; any other
+# buffer is copied exactly once, into a new segment that the receiver takes over.
+
+import pickle
+import time
+from multiprocessing import Pipe, Process, resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# Segments made by shared_array() in this process, by name.
+segments = {}
+
+# Segments opened by recv() that could not be closed yet, see Message.close().
+lingering = []
+
+
+# Every SharedMemory registers with the resource tracker of its process, which removes the segment when the process
+# ends, even if it only opened a segment that belongs to someone else. Segments whose lifetime another process
+# manages are taken off that list again (Python 3.13 can skip the registration with track=False).
+
+def untrack(segment):
+    resource_tracker.unregister(segment._name, 'shared_memory')
+
+
+def open_segment(name):
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        segment = SharedMemory(name=name)
+        untrack(segment)
+        return segment
+
+
+def buffer_address(buffer):
+    return np.frombuffer(buffer, dtype=np.uint8).ctypes.data if buffer.nbytes else 0
+
+
+def shared_array(shape, dtype=np.float64):
+    dtype = np.dtype(dtype)
+    segment = SharedMemory(create=True, size=max(1, int(np.prod(shape)) * dtype.itemsize))
+    segments[segment.name] = segment
+    return np.ndarray(shape, dtype, buffer=segment.buf)
+
+
+# Closes and removes every segment made by shared_array(); the arrays on them must be gone by then.
+
+def release_shared():
+    for segment in segments.values():
+        segment.close()
+        # A receiver sharing our resource tracker may have taken the segment off its list (see untrack);
+        # registering twice is harmless, and unlink() unregisters it again.
+        resource_tracker.register(segment._name, 'shared_memory')
+        segment.unlink()
+    segments.clear()
+
+
+# Where a buffer lives: (name, offset, length, owned). owned means the segment was made just for this message and the
+# receiver should remove it once it has opened it.
+
+def place_buffer(raw):
+    address = buffer_address(raw)
+    for name, segment in segments.items():
+        start = buffer_address(segment.buf)
+        if start <= address and address + raw.nbytes <= start + segment.size:
+            return (name, address - start, raw.nbytes, False), 0
+
+    segment = SharedMemory(create=True, size=max(1, raw.nbytes))
+    segment.buf[:raw.nbytes] = raw.cast('B')
+    name = segment.name
+    segment.close()
+    untrack(segment)  # the receiver removes it
+    return (name, 0, raw.nbytes, True), raw.nbytes
+
+
+# Sends obj and returns how many bytes were copied into shared memory and how many went through the pipe.
+
+def send(conn, obj):
+    buffers = []
+    stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    places = []
+    copied = 0
+    for buffer in buffers:
+        raw = buffer.raw()
+        place, nbytes = place_buffer(raw)
+        places.append(place)
+        copied += nbytes
+        raw.release()
+    message = pickle.dumps((stream, places), protocol=5)
+    conn.send_bytes(message)
+    return copied, len(message)
+
+
+class Message:
+    def __init__(self, value, segments):
+        self.value = value
+        self.segments = segments
+
+    def __enter__(self):
+        return self.value
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # A segment can only be closed once no array points into it any more. Segments that are still in use are kept in
+    # lingering and closed by a later recv(), after those arrays are gone.
+
+    def close(self):
+        self.value = None
+        lingering.extend(close_segments(self.segments))
+        self.segments = []
+
+
+def close_segments(segments):
+    still_used = []
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            still_used.append(segment)
+    return still_used
+
+
+def recv(conn):
+    lingering[:] = close_segments(lingering)
+    stream, places = pickle.loads(conn.recv_bytes())
+    opened = {}
+    views = []
+    for name, offset, length, owned in places:
+        if name not in opened and owned:
+            opened[name] = SharedMemory(name=name)
+            # The mapping stays valid after unlink; this only removes the name
+            opened[name].unlink()
+        elif name not in opened:
+            opened[name] = open_segment(name)
+        views.append(opened[name].buf[offset:offset + length])
+    value = pickle.loads(stream, buffers=views)
+    del views
+    return Message(value, list(opened.values()))
+
+
+# Usage;
+
+"""
+parent, child = Pipe()
+np_height = shared_array(1000)
+np_height[:] = 1.8
+send(parent, {"np_height": np_height, "np_weight": np.full(1000, 80.0)})
+
+# in the other process
+with recv(child) as arrays:
+    bmi = arrays["np_weight"] / arrays["np_height"] ** 2
+"""
+
+
+# Benchmark;
+# Round trips to a child process that reads one element of every array and answers. For each size: a plain
+# conn.send of the array, send() of an ordinary array (copied once into shared memory) and send() of an array made
+# with shared_array() (not copied).
+
+def echo(conn):
+    while True:
+        message = recv(conn)
+        if message.value is None:
+            return
+        with message as value:
+            conn.send(float(value[0]))
+
+
+def plain_echo(conn):
+    while True:
+        value = conn.recv()
+        if value is None:
+            return
+        conn.send(float(value[0]))
+
+
+def round_trip(conn, send_array, value, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        counts = send_array(conn, value)
+        conn.recv()
+        best = min(best, time.perf_counter() - start)
+    return best, counts
+
+
+def plain_send(conn, value):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    conn.send_bytes(data)
+    return 0, len(data)
+
+
+def benchmark(sizes_mb=(1, 16, 128, 1024), repeat=5):
+    parent, child = Pipe()
+    plain_parent, plain_child = Pipe()
+    workers = [Process(target=echo, args=(child,)), Process(target=plain_echo, args=(plain_child,))]
+    for worker in workers:
+        worker.start()
+    try:
+        print("%8s %-14s %12s %14s %14s" % ("MB", "transport", "latency ms", "shm copied", "pipe bytes"))
+        for size_mb in sizes_mb:
+            n = size_mb * 2 ** 20 // 8
+            ordinary = np.ones(n)
+            shared = shared_array(n)
+            shared[:] = 1
+            runs = (('plain pipe', plain_parent, plain_send, ordinary),
+                    ('pickle5 + shm', parent, send, ordinary),
+                    ('shared_array', parent, send, shared))
+            for name, conn, send_array, value in runs:
+                elapsed, (copied, piped) = round_trip(conn, send_array, value, repeat)
+                print("%8d %-14s %12.2f %14d %14d" % (size_mb, name, elapsed * 1000, copied, piped))
+            del ordinary, shared, runs, value
+            release_shared()
+    finally:
+        send(parent, None)
+        plain_parent.send(None)
+        for worker in workers:
+            worker.join()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,358 @@
+# Bitmap sets;
+# The set examples in day3.py (and day9.py) keep every event's attendees as a set of strings. With millions of
+# members and hundreds of events, every set holds its own hash table of pointers, and every intersection hashes and
+# compares strings one at a time. Attendance gives every member name a number once (0, 1, 2, ...) and keeps every
+# event as a compressed bitmap of those numbers, in the style of Roaring bitmaps:
+#
+# the numbers are split by their upper 16 bits into chunks of 65536, and each chunk that has members is stored
+# either as a sorted array of the lower 16 bits (up to ARRAY_LIMIT members, 2 bytes each) or as a bitmap of 1024
+# 64-bit words (8 KB, one bit per possible member). Set operations work chunk by chunk, and on two bitmaps they are
+# one NumPy &, |, ^ over the words; names are only looked up again for the final result.
+#
+#     events = Attendance()
+#     events.add('a', ["Jake", "John", "Eric"])
+#     events.add('b', ["John", "Jill"])
+#     print(events.intersection('a', 'b'))          # ['John']
+
+import random
+import sys
+import time
+
+import numpy as np
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+WORDS = CHUNK_SIZE // 64
+
+# Above this many members a chunk takes less room as a bitmap (8 KB) than as an array (2 bytes per member).
+ARRAY_LIMIT = 4096
+
+
+# Number of 1 bits in an array of words; np.bitwise_count came with NumPy 2.0.
+
+if hasattr(np, 'bitwise_count'):
+    def count_bits(words):
+        return int(np.bitwise_count(words).sum())
+else:
+    def count_bits(words):
+        return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+# A container is a uint16 array of members (sorted) or a uint64 array of WORDS words.
+
+def is_array(container):
+    return container.dtype == np.uint16
+
+
+def to_words(container):
+    if not is_array(container):
+        return container
+    bits = np.zeros(CHUNK_SIZE, dtype=bool)
+    bits[container] = True
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+
+def members(container):
+    if is_array(container):
+        return container
+    return np.flatnonzero(np.unpackbits(container.view(np.uint8), bitorder='little')).astype(np.uint16)
+
+
+def from_words(words):
+    # The cheaper form of a bitmap; None when it is empty
+    count = count_bits(words)
+    if count == 0:
+        return None
+    if count <= ARRAY_LIMIT:
+        return members(words)
+    return words
+
+
+def from_members(lows):
+    if len(lows) == 0:
+        return None
+    return lows if len(lows) <= ARRAY_LIMIT else to_words(lows)
+
+
+def cardinality(container):
+    return len(container) if is_array(container) else count_bits(container)
+
+
+def contains(container, lows):
+    # For each of lows: is it in the container?
+    if is_array(container):
+        return np.isin(lows, container, assume_unique=True)
+    return (container[lows >> 6] >> (lows & 63).astype(np.uint64)) & 1 == 1
+
+
+def and_containers(first, second):
+    if is_array(first) and is_array(second):
+        return from_members(np.intersect1d(first, second, assume_unique=True))
+    if is_array(first) or is_array(second):
+        array, bitmap = (first, second) if is_array(first) else (second, first)
+        return from_members(array[contains(bitmap, array)])
+    return from_words(first & second)
+
+
+def or_containers(first, second):
+    if is_array(first) and is_array(second) and len(first) + len(second) <= ARRAY_LIMIT:
+        return np.union1d(first, second).astype(np.uint16)
+    return from_words(to_words(first) | to_words(second))
+
+
+def andnot_containers(first, second):
+    if is_array(first):
+        return from_members(first[~contains(second, first)])
+    return from_words(first & ~to_words(second))
+
+
+def xor_containers(first, second):
+    if is_array(first) and is_array(second):
+        return from_members(np.setxor1d(first, second, assume_unique=True).astype(np.uint16))
+    return from_words(to_words(first) ^ to_words(second))
+
+
+class Bitmap:
+    def __init__(self, chunks=None):
+        self.chunks = chunks or {}  # upper bits -> container
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = np.unique(np.asarray(ids, dtype=np.uint32))
+        highs = ids >> CHUNK_BITS
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        chunks = {}
+        for part in np.split(ids, bounds) if ids.size else []:
+            chunks[int(part[0] >> CHUNK_BITS)] = from_members((part & (CHUNK_SIZE - 1)).astype(np.uint16))
+        return cls(chunks)
+
+    def ids(self):
+        parts = [members(self.chunks[high]).astype(np.uint32) + (high << CHUNK_BITS) for high in sorted(self.chunks)]
+        return np.concatenate(parts) if parts else np.array([], dtype=np.uint32)
+
+    def __len__(self):
+        return sum(map(cardinality, self.chunks.values()))
+
+    def __contains__(self, id):
+        container = self.chunks.get(id >> CHUNK_BITS)
+        return container is not None and bool(contains(container, np.array([id & (CHUNK_SIZE - 1)]))[0])
+
+    @property
+    def nbytes(self):
+        return sum(container.nbytes for container in self.chunks.values())
+
+    def combine(self, other, operation, keys):
+        chunks = {}
+        for high in keys:
+            mine, theirs = self.chunks.get(high), other.chunks.get(high)
+            if mine is None or theirs is None:
+                result = mine if theirs is None else theirs
+            else:
+                result = operation(mine, theirs)
+            if result is not None:
+                chunks[high] = result
+        return Bitmap(chunks)
+
+    def intersection(self, other):
+        return self.combine(other, and_containers, self.chunks.keys() & other.chunks.keys())
+
+    def union(self, other):
+        return self.combine(other, or_containers, self.chunks.keys() | other.chunks.keys())
+
+    def difference(self, other):
+        chunks = {}
+        for high, container in self.chunks.items():
+            result = container if high not in other.chunks else andnot_containers(container, other.chunks[high])
+            if result is not None:
+                chunks[high] = result
+        return Bitmap(chunks)
+
+    def symmetric_difference(self, other):
+        return self.combine(other, xor_containers, self.chunks.keys() | other.chunks.keys())
+
+    __and__ = intersection
+    __or__ = union
+    __sub__ = difference
+    __xor__ = symmetric_difference
+
+
+# Many bitmaps at once: the intersection only looks at chunks every bitmap has, smallest bitmap first, and stops as
+# soon as a chunk runs empty; the union ORs all the words of a chunk into one buffer.
+
+def intersect_all(bitmaps):
+    bitmaps = sorted(bitmaps, key=len)
+    if not bitmaps:
+        return Bitmap()
+    chunks = {}
+    for high in set(bitmaps[0].chunks).intersection(*(bitmap.chunks for bitmap in bitmaps[1:])):
+        result = bitmaps[0].chunks[high]
+        for bitmap in bitmaps[1:]:
+            result = and_containers(result, bitmap.chunks[high])
+            if result is None:
+                break
+        else:
+            chunks[high] = result
+    return Bitmap(chunks)
+
+
+def union_all(bitmaps):
+    by_chunk = {}
+    for bitmap in bitmaps:
+        for high, container in bitmap.chunks.items():
+            by_chunk.setdefault(high, []).append(container)
+    chunks = {}
+    for high, containers in by_chunk.items():
+        words = np.zeros(WORDS, dtype=np.uint64)
+        bits = None
+        for container in containers:
+            if is_array(container):
+                if bits is None:
+                    bits = np.zeros(CHUNK_SIZE, dtype=bool)
+                bits[container] = True
+            else:
+                words |= container
+        if bits is not None:
+            words |= np.packbits(bits, bitorder='little').view(np.uint64)
+        chunks[high] = from_words(words)
+    return Bitmap(chunks)
+
+
+# Gives every name a number once, in the order they are first seen.
+
+class Interner:
+    def __init__(self):
+        self.numbers = {}
+        self.names = []
+        self.table = np.array([], dtype=object)  # the names as an array, for decode; rebuilt when names were added
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, names):
+        numbers = self.numbers
+        result = []
+        for name in names:
+            number = numbers.get(name)
+            if number is None:
+                number = numbers[name] = len(self.names)
+                self.names.append(name)
+            result.append(number)
+        return result
+
+    def lookup(self, names):
+        # Names never seen get no number
+        return [self.numbers[name] for name in names if name in self.numbers]
+
+    def decode(self, ids):
+        if len(self.table) != len(self.names):
+            self.table = np.array(self.names, dtype=object)
+        return self.table[ids].tolist()
+
+
+class Attendance:
+    def __init__(self):
+        self.interner = Interner()
+        self.events = {}
+
+    def add(self, event, names):
+        bitmap = Bitmap.from_ids(self.interner.intern(names))
+        self.events[event] = self.events[event] | bitmap if event in self.events else bitmap
+
+    def attended(self, event, name):
+        number = self.interner.numbers.get(name)
+        return number is not None and number in self.events[event]
+
+    def names(self, bitmap):
+        return self.interner.decode(bitmap.ids())
+
+    def members(self, event):
+        return self.names(self.events[event])
+
+    def intersection(self, *events):
+        return self.names(intersect_all([self.events[event] for event in events]))
+
+    def union(self, *events):
+        return self.names(union_all([self.events[event] for event in events]))
+
+    def difference(self, first, second):
+        return self.names(self.events[first] - self.events[second])
+
+    def symmetric_difference(self, first, second):
+        return self.names(self.events[first] ^ self.events[second])
+
+    @property
+    def nbytes(self):
+        return sum(bitmap.nbytes for bitmap in self.events.values())
+
+
+# Usage;
+
+"""
+events = Attendance()
+events.add('a', ["Jake", "John", "Eric"])
+events.add('b', ["John", "Jill"])
+
+print(events.intersection('a', 'b'))
+print(events.symmetric_difference('a', 'b'))
+print(events.difference('a', 'b'))
+print(events.union('a', 'b'))
+"""
+
+
+# Benchmark;
+# members names and events events, each attended by a random share of the members (from 0.1% to 50%): memory of the
+# event sets (the set tables, not the names they share) against the bitmaps, and the time of pairwise and many-way
+# operations with Python sets and with bitmaps, without and with decoding the results to names.
+
+def benchmark(members=1_000_000, events=100, repeat=3):
+    rng = np.random.default_rng(0)
+    names = ["member-%d" % number for number in range(members)]
+    attendance = Attendance()
+    attendance.interner.intern(names)
+    sets = {}
+    for event in range(events):
+        share = 10 ** rng.uniform(-3, np.log10(0.5))
+        chosen = np.flatnonzero(rng.random(members) < share)
+        sets[event] = {names[number] for number in chosen.tolist()}
+        attendance.events[event] = Bitmap.from_ids(chosen)
+
+    set_bytes = sum(map(sys.getsizeof, sets.values()))
+    print("memory: sets %.1f MB, bitmaps %.1f MB" % (set_bytes / 2 ** 20, attendance.nbytes / 2 ** 20))
+
+    pairs = [tuple(random.Random(pair).sample(range(events), 2)) for pair in range(20)]
+    group = list(range(0, events, max(1, events // 10)))
+    bitmaps = attendance.events
+    runs = [('intersection x20', lambda: [sets[x] & sets[y] for x, y in pairs],
+             lambda: [bitmaps[x] & bitmaps[y] for x, y in pairs],
+             lambda: [attendance.intersection(x, y) for x, y in pairs]),
+            ('difference x20', lambda: [sets[x] - sets[y] for x, y in pairs],
+             lambda: [bitmaps[x] - bitmaps[y] for x, y in pairs],
+             lambda: [attendance.difference(x, y) for x, y in pairs]),
+            ('sym. diff. x20', lambda: [sets[x] ^ sets[y] for x, y in pairs],
+             lambda: [bitmaps[x] ^ bitmaps[y] for x, y in pairs],
+             lambda: [attendance.symmetric_difference(x, y) for x, y in pairs]),
+            ('union of %d' % len(group), lambda: [set().union(*(sets[x] for x in group))],
+             lambda: [union_all([bitmaps[x] for x in group])],
+             lambda: [attendance.union(*group)]),
+            ('intersect. of %d' % len(group), lambda: [set.intersection(*(sets[x] for x in group))],
+             lambda: [intersect_all([bitmaps[x] for x in group])],
+             lambda: [attendance.intersection(*group)])]
+    print("%-18s %12s %12s %14s" % ("operation", "set ms", "bitmap ms", "+ names ms"))
+    for label, with_sets, with_bitmaps, with_names in runs:
+        timings = []
+        results = []
+        for function in (with_sets, with_bitmaps, with_names):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = function()
+                best = min(best, time.perf_counter() - start)
+            timings.append(best)
+            if function is not with_bitmaps:
+                results.append([set(part) for part in result])
+        assert results[0] == results[1]
+        print("%-18s %12.2f %12.2f %14.2f" % (label, timings[0] * 1000, timings[1] * 1000, timings[2] * 1000))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,106 @@
+# Blocked BMI over memory-mapped arrays;
+# bmi = np_weight / np_height ** 2 builds a temporary array for np_height ** 2, another one for the division, and
+# bmi > 23 builds a boolean mask as long as the whole dataset. For hundreds of millions of observations we keep the
+# heights and weights on disk in .npy files, map them into memory with np.memmap, and work through them one block at
+# a time, writing every intermediate result into buffers that are allocated once.
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+BLOCK_SIZE = 1 << 20
+
+
+# np.load with mmap_mode returns an np.memmap, so nothing is read until a block is touched.
+
+def open_arrays(height_path, weight_path):
+    np_height = np.load(height_path, mmap_mode='r')
+    np_weight = np.load(weight_path, mmap_mode='r')
+    if np_height.shape != np_weight.shape:
+        raise ValueError("height and weight have different shapes: %s, %s" % (np_height.shape, np_weight.shape))
+    return np_height, np_weight
+
+
+# Yields (start, bmi) for every block. The bmi array is the same buffer on every step, so copy it if you keep it.
+
+def bmi_blocks(np_height, np_weight, block=BLOCK_SIZE):
+    out = np.empty(min(block, len(np_height)), dtype=np.float64)
+    for start in range(0, len(np_height), block):
+        height = np_height[start:start + block]
+        bmi = out[:len(height)]
+        np.multiply(height, height, out=bmi)
+        np.divide(np_weight[start:start + block], bmi, out=bmi)
+        yield start, bmi
+
+
+# The streaming version of bmi[bmi > 23]: yields (indices, values) for the matches of every block.
+# The mask is also a reused buffer, so memory stays at a couple of blocks however long the arrays are.
+
+def bmi_over(np_height, np_weight, threshold=23, block=BLOCK_SIZE):
+    mask = np.empty(min(block, len(np_height)), dtype=bool)
+    for start, bmi in bmi_blocks(np_height, np_weight, block):
+        hits = mask[:len(bmi)]
+        np.greater(bmi, threshold, out=hits)
+        indices = np.flatnonzero(hits)
+        if len(indices):
+            yield indices + start, bmi[indices]
+
+
+# Writes the full BMI array to another .npy file, block by block.
+
+def bmi_to_npy(height_path, weight_path, bmi_path, block=BLOCK_SIZE):
+    np_height, np_weight = open_arrays(height_path, weight_path)
+    bmi_file = np.lib.format.open_memmap(bmi_path, mode='w+', dtype=np.float64, shape=np_height.shape)
+    for start, bmi in bmi_blocks(np_height, np_weight, block):
+        bmi_file[start:start + len(bmi)] = bmi
+    bmi_file.flush()
+    return bmi_file
+
+
+# Usage;
+
+"""
+np_height, np_weight = open_arrays('height.npy', 'weight.npy')
+for indices, values in bmi_over(np_height, np_weight, 23):
+    print(indices, values)
+"""
+
+
+# Benchmark;
+# Compares the in-memory expression from day3.py with the blocked version on the same .npy files.
+
+def eager(height_path, weight_path, threshold=23):
+    np_height = np.load(height_path)
+    np_weight = np.load(weight_path)
+    bmi = np_weight / np_height ** 2
+    return np.flatnonzero(bmi > threshold)
+
+
+def blocked(height_path, weight_path, threshold=23):
+    np_height, np_weight = open_arrays(height_path, weight_path)
+    return sum(len(indices) for indices, values in bmi_over(np_height, np_weight, threshold))
+
+
+def benchmark(sizes=(1_000_000, 10_000_000, 50_000_000)):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        height_path = os.path.join(tmp, 'height.npy')
+        weight_path = os.path.join(tmp, 'weight.npy')
+        for size in sizes:
+            np.save(height_path, rng.uniform(1.5, 2.0, size))
+            np.save(weight_path, rng.uniform(50, 110, size))
+            for name, run in (('eager', eager), ('blocked', blocked)):
+                tracemalloc.start()
+                start = time.perf_counter()
+                run(height_path, weight_path)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print("%-7s %11d  %8.3f s  peak %8.1f MB" % (name, size, elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,120 @@
+# Parallel BMI;
+# The BMI calculation is the same for every observation, so the arrays can be split into ranges and each range handed
+# to its own process. The heights and weights live in multiprocessing.shared_memory blocks, so the workers map the same
+# memory instead of receiving pickled copies. Every worker writes its BMI values and the indices above the threshold
+# straight into shared output arrays and only sends back how many hits it found.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from bmi_blocks import BLOCK_SIZE
+
+FIELDS = (('height', np.float64), ('weight', np.float64), ('bmi', np.float64), ('hits', np.int64))
+
+
+def attach(names, size):
+    blocks = [SharedMemory(name=name) for name in names]
+    arrays = [np.ndarray(size, dtype, buffer=block.buf) for block, (field, dtype) in zip(blocks, FIELDS)]
+    return blocks, arrays
+
+
+# The hits of the range [lo, hi) are written to hits[lo:lo + count]; there can never be more than hi - lo of them,
+# so the ranges never overlap and no locking is needed.
+
+def bmi_range(names, size, lo, hi, threshold, block):
+    blocks, (height, weight, bmi, hits) = attach(names, size)
+    mask = np.empty(min(block, hi - lo), dtype=bool)
+    count = 0
+    for start in range(lo, hi, block):
+        stop = min(start + block, hi)
+        out = bmi[start:stop]
+        np.multiply(height[start:stop], height[start:stop], out=out)
+        np.divide(weight[start:stop], out, out=out)
+        over = mask[:stop - start]
+        np.greater(out, threshold, out=over)
+        indices = np.flatnonzero(over)
+        hits[lo + count:lo + count + len(indices)] = indices + start
+        count += len(indices)
+
+    # The arrays point into the shared memory, so they have to go before the blocks can be closed
+    del height, weight, bmi, hits, out
+    for shared in blocks:
+        shared.close()
+    return count
+
+
+class SharedBMI:
+    def __init__(self, size):
+        self.size = size
+        self.blocks = []
+        for field, dtype in FIELDS:
+            shared = SharedMemory(create=True, size=max(1, size * np.dtype(dtype).itemsize))
+            self.blocks.append(shared)
+            setattr(self, field, np.ndarray(size, dtype, buffer=shared.buf))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for field, dtype in FIELDS:
+            setattr(self, field, None)
+        for shared in self.blocks:
+            shared.close()
+            shared.unlink()
+        self.blocks = []
+
+    # Fills self.bmi and returns the indices with a BMI above the threshold, in ascending order.
+
+    def run(self, threshold=23, workers=None, block=BLOCK_SIZE):
+        workers = workers or os.cpu_count()
+        names = [shared.name for shared in self.blocks]
+        bounds = np.linspace(0, self.size, workers + 1).astype(int)
+        ranges = [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(bmi_range, names, self.size, lo, hi, threshold, block) for lo, hi in ranges]
+            counts = [future.result() for future in futures]
+        return np.concatenate([self.hits[lo:lo + count] for (lo, hi), count in zip(ranges, counts)] or [self.hits[:0]])
+
+
+def parallel_bmi(np_height, np_weight, threshold=23, workers=None, block=BLOCK_SIZE):
+    with SharedBMI(len(np_height)) as shared:
+        shared.height[:] = np_height
+        shared.weight[:] = np_weight
+        indices = shared.run(threshold, workers, block)
+        return shared.bmi.copy(), indices
+
+
+# Usage;
+# Filling shared.height and shared.weight directly (for example from bmi_blocks.open_arrays) avoids the extra copy.
+
+"""
+bmi, indices = parallel_bmi(np_height, np_weight, 23)
+print(bmi[indices])
+"""
+
+
+# Benchmark;
+# Throughput of SharedBMI.run for 1 up to os.cpu_count() workers on the same arrays.
+
+def benchmark(size=100_000_000, repeat=3):
+    rng = np.random.default_rng(0)
+    with SharedBMI(size) as shared:
+        shared.height[:] = rng.uniform(1.5, 2.0, size)
+        shared.weight[:] = rng.uniform(50, 110, size)
+        for workers in range(1, os.cpu_count() + 1):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                shared.run(23, workers)
+            elapsed = (time.perf_counter() - start) / repeat
+            print("%2d workers  %8.3f s  %8.1f M obs/s" % (workers, elapsed, size / elapsed / 1e6))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,95 @@
+# Compact brics DataFrame;
+# pd.DataFrame(dict) keeps country and capital as columns of Python strings and area and population as float64.
+# With millions of rows the strings take most of the memory, even though only a handful of distinct values exist.
+# This builder stores every string column as a categorical (each distinct string once, plus a small integer code per
+# row), stores floats in the narrowest float type that gives back exactly the same values and ints in the narrowest
+# int type that holds them, and passes the index to the constructor instead of assigning brics.index afterwards.
+
+import numpy as np
+import pandas as pd
+
+FLOAT_TYPES = (np.float16, np.float32, np.float64)
+INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+UINT_TYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+# "Exactly" means bit for bit: 1.5 fits in a float16, but 8.516 only has an exact float64 twin, so it stays float64.
+
+def narrowest_float(values):
+    values = np.asarray(values, dtype=np.float64)
+    for float_type in FLOAT_TYPES:
+        # Values too big for a type become inf there and fail the comparison
+        with np.errstate(over='ignore'):
+            narrow = values.astype(float_type)
+        if np.array_equal(narrow.astype(np.float64), values, equal_nan=True):
+            return narrow
+    return values
+
+
+def narrowest_int(values):
+    if values.size == 0:
+        return values
+    low, high = values.min(), values.max()
+    for int_type in UINT_TYPES if values.dtype.kind == 'u' else INT_TYPES:
+        if np.iinfo(int_type).min <= low and high <= np.iinfo(int_type).max:
+            return values.astype(int_type)
+    return values
+
+
+def compact_column(values):
+    values = np.asarray(values)
+    if values.dtype.kind in 'OUS':
+        return pd.Categorical(values)
+    if values.dtype.kind in 'iu':
+        return narrowest_int(values)
+    if values.dtype.kind == 'f':
+        return narrowest_float(values)
+    return values
+
+
+def build_brics(data, index=None):
+    if index is not None:
+        index = pd.CategoricalIndex(index)
+    return pd.DataFrame({name: compact_column(values) for name, values in data.items()}, index=index)
+
+
+# Bytes used by every column (and the index) before and after, as reported by memory_usage(deep=True).
+
+def memory_report(before, after):
+    before_usage = before.memory_usage(deep=True)
+    after_usage = after.memory_usage(deep=True)
+    print("%-12s %-10s %-10s %14s %14s" % ("column", "before", "after", "bytes before", "bytes after"))
+    for name in before_usage.index:
+        before_type = before.index.dtype if name == 'Index' else before[name].dtype
+        after_type = after.index.dtype if name == 'Index' else after[name].dtype
+        print("%-12s %-10s %-10s %14d %14d" % (name, before_type, after_type, before_usage[name], after_usage[name]))
+    print("%-12s %-10s %-10s %14d %14d" % ("total", "", "", before_usage.sum(), after_usage.sum()))
+
+
+# Usage;
+
+"""
+brics = build_brics(dict, index=["BR", "RU", "IN", "CH", "SA"])
+print(brics)
+"""
+
+
+# Benchmark;
+# The five brics rows repeated up to a few million rows, built the way day3.py does it and with build_brics.
+
+def benchmark(repeat=1_000_000):
+    data = {"country": ["Brazil", "Russia", "India", "China", "South Africa"] * repeat,
+            "capital": ["Brasilia", "Moscow", "New Dehli", "Beijing", "Pretoria"] * repeat,
+            "area": [8.516, 17.10, 3.286, 9.597, 1.221] * repeat,
+            "population": [200.4, 143.5, 1252, 1357, 52.98] * repeat}
+    index = ["BR", "RU", "IN", "CH", "SA"] * repeat
+
+    before = pd.DataFrame(data)
+    before.index = index
+    after = build_brics(data, index)
+    assert (before.astype(str).to_numpy() == after.astype(str).to_numpy()).all()
+    memory_report(before, after)
+
+
+if __name__ == '__main__':
+    benchmark()
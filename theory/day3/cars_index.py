@@ -0,0 +1,84 @@
+# Label index for cars.loc;
+# cars.loc[['AUS', 'EG']] has to search the row labels every time it is called, and when the labels are not unique
+# and not sorted pandas takes its slow path. Here we group the row offsets by label once, when the data is loaded,
+# so a lookup of thousands of labels becomes a few array operations and a single take().
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from cars_stream import read_cars
+
+
+class LabelIndex:
+    def __init__(self, frame):
+        self.frame = frame
+        codes, uniques = pd.factorize(frame.index, use_na_sentinel=False)
+        self.labels = pd.Index(uniques)  # unique labels, so get_indexer is a plain hash lookup
+        # Row offsets sorted by label; the rows of label number i are order[starts[i]:starts[i + 1]],
+        # kept in file order because the sort is stable.
+        self.order = np.argsort(codes, kind='stable')
+        self.starts = np.zeros(len(uniques) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(codes, minlength=len(uniques)), out=self.starts[1:])
+
+    # Row offsets for a batch of labels, in the same order cars.loc would return them.
+
+    def rows(self, labels):
+        codes = self.labels.get_indexer(labels)
+        if (codes < 0).any():
+            missing = [label for label, code in zip(labels, codes) if code < 0]
+            raise KeyError("%s not in index" % missing)
+
+        starts = self.starts[codes]
+        counts = self.starts[codes + 1] - starts
+        # Expand every [start, start + count) range at once instead of slicing label by label
+        ends = np.cumsum(counts)
+        steps = np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - counts, counts)
+        return self.order[np.repeat(starts, counts) + steps]
+
+    def loc(self, labels):
+        return self.frame.take(self.rows(labels))
+
+    def iloc(self, i):
+        return self.frame.iloc[i]
+
+
+def load_cars_index(path):
+    return LabelIndex(read_cars(path))
+
+
+# Usage;
+
+"""
+cars = load_cars_index('cars.csv')
+print(cars.iloc(2))
+print(cars.loc(['AUS', 'EG']))
+"""
+
+
+# Benchmark;
+# A frame with non-unique, unsorted labels, queried with batches of labels through plain .loc and the LabelIndex.
+
+def benchmark(rows=1_000_000, distinct=20_000, batches=(10, 1_000, 10_000), repeat=5):
+    rng = np.random.default_rng(0)
+    codes = np.array(['C%05d' % i for i in range(distinct)])
+    frame = pd.DataFrame({'cars_per_cap': rng.integers(1, 1000, rows)}, index=codes[rng.integers(0, distinct, rows)])
+
+    start = time.perf_counter()
+    index = LabelIndex(frame)
+    print("build %d rows: %.3f s" % (rows, time.perf_counter() - start))
+
+    for size in batches:
+        query = list(codes[rng.integers(0, distinct, size)])
+        assert index.loc(query).equals(frame.loc[query])
+        for name, lookup in (('.loc', lambda: frame.loc[query]), ('LabelIndex', lambda: index.loc(query))):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                lookup()
+            elapsed = (time.perf_counter() - start) / repeat
+            print("%-10s %6d labels  %8.2f ms" % (name, size, elapsed * 1000))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,150 @@
+# Streaming cars.csv;
+# pd.read_csv('cars.csv') parses every column of the file into memory in one go. The lessons only ever look at the
+# row labels (US, AUS, JPN, ...) and the cars_per_cap and country columns, so for big files we read the csv in
+# fixed-size chunks, parse just those columns with an explicit dtype map, and build the index once at the end.
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CARS_COLUMNS = ['cars_per_cap', 'country']
+CARS_DTYPES = {'cars_per_cap': 'int64', 'country': 'category'}
+CHUNK_SIZE = 100_000
+
+
+# The row labels live in the first, unnamed column of cars.csv, so we peek at the header to find its name.
+
+def label_column(path):
+    return pd.read_csv(path, nrows=0).columns[0]
+
+
+# A generator of small DataFrames; only one chunk is parsed and alive at a time.
+
+def iter_cars(path, chunksize=CHUNK_SIZE):
+    label = label_column(path)
+    dtypes = dict(CARS_DTYPES)
+    dtypes[label] = str
+    with pd.read_csv(path, usecols=[label] + CARS_COLUMNS, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield chunk.set_index(label)[CARS_COLUMNS]
+
+
+# An upper bound on the number of rows: the number of lines (a quoted field may span lines, so there can be fewer).
+
+def count_lines(path):
+    with open(path, 'rb') as file:
+        return sum(block.count(b'\n') for block in iter(lambda: file.read(1 << 20), b'')) + 1
+
+
+# Copy the projected columns chunk by chunk into arrays allocated once up front, and build the DataFrame (and its
+# index) on top of them without another copy. Each chunk gets its own categories for country, so their codes are
+# translated to one shared list of categories on the way.
+
+def read_cars(path, chunksize=CHUNK_SIZE):
+    size = count_lines(path)
+    labels = np.empty(size, dtype=object)
+    cars_per_cap = np.empty(size, dtype=np.int64)
+    codes = np.empty(size, dtype=np.int32)
+    categories = {}
+    rows = 0
+    for chunk in iter_cars(path, chunksize):
+        end = rows + len(chunk)
+        labels[rows:end] = chunk.index.to_numpy()
+        cars_per_cap[rows:end] = chunk['cars_per_cap'].to_numpy()
+        country = chunk['country'].array
+        shared = np.array([categories.setdefault(name, len(categories)) for name in country.categories] + [-1],
+                          dtype=np.int32)
+        codes[rows:end] = shared[country.codes]  # code -1 (missing) picks the -1 at the end
+        rows = end
+
+    country = pd.Categorical.from_codes(codes[:rows], categories=list(categories))
+    return pd.DataFrame({'cars_per_cap': cars_per_cap[:rows], 'country': country},
+                        index=pd.Index(labels[:rows]), copy=False)
+
+
+# Usage; the same selections as in day3.py work on the result.
+
+"""
+cars = read_cars('cars.csv')
+print(cars[['cars_per_cap', 'country']])
+print(cars.iloc[2])
+print(cars.loc[['AUS', 'EG']])
+"""
+
+
+# Benchmark;
+# Writes a synthetic cars.csv with a few extra columns and compares the eager load, read_cars and a pass over
+# iter_cars that only sums cars_per_cap. Each one runs in a fresh interpreter, whose peak resident memory (which also
+# counts the buffers of pandas' C parser) is reported above that of an interpreter that only imported pandas.
+
+def write_cars(path, rows):
+    rng = np.random.default_rng(0)
+    codes = np.array(['US', 'AUS', 'JPN', 'IN', 'RU', 'MOR', 'EG'])
+    names = np.array(['United States', 'Australia', 'Japan', 'India', 'Russia', 'Morocco', 'Egypt'])
+    picks = rng.integers(0, len(codes), rows)
+    pd.DataFrame({'cars_per_cap': rng.integers(1, 1000, rows),
+                  'country': names[picks],
+                  'drives_right': rng.integers(0, 2, rows).astype(bool),
+                  'notes': 'some free text that nobody reads'},
+                 index=codes[picks]).to_csv(path)
+
+
+LOADS = {'baseline': 'None',
+         'eager': 'pd.read_csv(path, index_col=0)',
+         'read_cars': 'read_cars(path)',
+         'iter_cars': 'sum(int(chunk["cars_per_cap"].sum()) for chunk in iter_cars(path))'}
+
+MEASURE = """
+import sys, time
+sys.path.insert(0, %r)
+from cars_stream import *
+path = %r
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start, peak_rss())
+"""
+
+
+# Peak resident bytes of this process. On Linux ru_maxrss also remembers the parent's peak from before exec, so
+# VmHWM from /proc is used there; ru_maxrss is in bytes on macOS.
+
+def peak_rss():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# (seconds, peak resident bytes) of one load in a fresh interpreter.
+
+def measure(load, path):
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, '-c', MEASURE % (here, path, LOADS[load])],
+                            check=True, capture_output=True, text=True).stdout.split()
+    return float(output[0]), int(output[1])
+
+
+def benchmark(sizes=(100_000, 1_000_000, 3_000_000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cars.csv')
+        for rows in sizes:
+            write_cars(path, rows)
+            baseline = measure('baseline', path)[1]
+            for name in ('eager', 'read_cars', 'iter_cars'):
+                elapsed, peak = measure(name, path)
+                print("%-10s %10d rows  %8.3f s  peak RSS +%8.1f MB"
+                      % (name, rows, elapsed, (peak - baseline) / 2 ** 20))
+
+
+if __name__ == '__main__':
+    benchmark()
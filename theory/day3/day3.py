@@ -29,6 +29,9 @@ print(bmi)
 
 print(bmi[bmi > 23])
 
+# For arrays that do not fit in memory, bmi_blocks.py runs the same steps over .npy files, one block at a time,
+# and bmi_parallel.py splits them across processes that share the arrays through shared memory.
+
 # Pandas Basics;
 # Pandas DataFrames;
 # Pandas is a high-level data manipulation tool. It is built on the Numpy package and its key data structure
@@ -62,12 +65,16 @@ print(brics)
 brics.index = ["BR", "RU", "IN", "CH", "SA"]
 print(brics)
 
+# brics.py builds the same DataFrame with categorical string columns and the index set up front, to save memory.
+
 # Another way to create a DataFrame is by importing a csv file using Pandas.
 # The csv cars.csv is stored and can be imported using pd.read_csv
 
 cars = pd.read_csv('cars.csv')
 print(cars)
 
+# For csv files too big to load in one go, cars_stream.py reads only these columns, chunk by chunk.
+
 # Indexing DataFrames;
 # There are several ways to index a Pandas DataFrame. One of the easiest ways to do this is by using square
 # bracket notation. You can use square brackets to select one column of the cars DataFrame. You can either use
@@ -97,6 +104,8 @@ print(cars.iloc[2])
 # Print out observations for Australia and Egypt
 print(cars.loc[['AUS', 'EG']])
 
+# When the same lookups run over and over on a large frame, cars_index.py groups the rows by label once up front.
+
 # Generators;
 # Generators are very easy to implement, but a bit difficult to understand. Generators are used to create iterators,
 # but with a different approach. Generators are simple functions which return an iterable set of items, one at a time,
@@ -120,6 +129,7 @@ for random_number in lottery():
 
 # This function decides how to generate the random numbers on its own, and executes the yield statements one at a time,
 # pausing in between to yield execution back to the main for loop.
+# lottery.py has a seedable version of this generator, plus a batch mode that fills many draws at once with NumPy.
 
 
 """
@@ -142,6 +152,8 @@ if type(fib()) == types.GeneratorType:
             break
 """
 
+# fibonacci.py jumps straight to any F(n) with fast doubling and can keep iterating from there.
+
 # List Comprehensions;
 # List Comprehensions is a very powerful tool, which creates a new list based on another list, in a single, readable line.
 
@@ -216,6 +228,9 @@ print("Result: %d" % result)
 
 # So, the following lines would be matched by that regex: From: python-list@python.org To: !asp]<,. python-list@python.org
 
+# header_scan.py runs this search over whole mailbox files, and can look for many addresses in one pass.
+# header_scan_parallel.py splits a big file into pieces and scans them in several processes.
+
 
 # Exception Handling;
 # When programming, errors happen. It's just a fact of life. Perhaps the user gave bad input. Maybe a network
@@ -240,12 +255,16 @@ def catch_this():
 
 catch_this()
 
+# padded.py pads short sequences with a default value without raising IndexError, for one list or a whole batch.
+
 
 # Sets;
 # Sets are lists with no duplicate entries.
 
 print(set("my name is Eric and Eric is my name".split()))
 
+# sketches.py estimates membership and the number of distinct items in fixed memory, for streams too big for a set.
+
 # Sets are a powerful tool in Python since they have the ability to calculate differences and intersections between
 # other sets.
 
@@ -269,6 +288,8 @@ print(b.difference(a))
 
 print(a.union(b))
 
+# bitmap_sets.py numbers the members and keeps each event as a compressed bitmap, for millions of members.
+
 # Serialization;
 # Python provides built-in JSON libraries to encode and decode JSON.
 
@@ -288,6 +309,8 @@ import json
 json_string = json.dumps([1, 2, 3, "a", "b", "c"])
 print(json_string)
 
+# json_stream.py writes and reads very long JSON arrays element by element, without the whole list in memory.
+
 # Python supports a Python proprietary data serialization method called pickle
 # (and a faster alternative called cPickle).
 
@@ -295,6 +318,9 @@ import pickle
 pickled_string = pickle.dumps([1, 2, 3, "a", "b", "c"])
 print(pickle.loads(pickled_string))
 
+# serializers.py puts json, pickle and two binary formats behind one dumps/loads pair, with a benchmark to compare them.
+# array_transport.py uses pickle protocol 5 to pass NumPy arrays to other processes through shared memory.
+
 # Partial functions;
 # You can create partial functions in python by using the partial function from the functools library.
 # Partial functions allow one to derive a function with x parameters to a function with fewer parameters and
@@ -314,6 +340,8 @@ print(p(8))
 60
 """
 
+# partial_sweep.py runs a partial like p over huge ranges of x, in worker processes or as NumPy arrays.
+
 # Code Introspection;
 # Code introspection is the ability to examine classes, functions and keywords to know what they are, what they do
 # and what they know. Python provides several functions and utilities for code introspection.
@@ -0,0 +1,137 @@
+# Fibonacci numbers;
+# The fib() generator in day3.py and the a, b = b, a+b loop in day5.py walk the sequence one number at a time, so
+# getting F(n) costs n big-integer additions. Fast doubling jumps there in about log2(n) steps using
+#   F(2k)     = F(k) * (2 * F(k + 1) - F(k))
+#   F(2k + 1) = F(k) ** 2 + F(k + 1) ** 2
+# Every answer is also kept in a small LRU table of checkpoints. A later query within a few hundred places of a
+# checkpoint walks there with additions (or subtractions, going backwards) instead of doubling all over again.
+# Here F(0) = 0 and F(1) = F(2) = 1.
+
+import time
+from collections import OrderedDict
+
+MAX_CHECKPOINTS = 256
+MAX_WALK = 256
+
+checkpoints = OrderedDict()
+
+
+# Returns the pair (F(n), F(n + 1)) by fast doubling.
+
+def doubling_pair(n):
+    if n == 0:
+        return 0, 1
+    a, b = doubling_pair(n >> 1)
+    even = a * (2 * b - a)
+    odd = a * a + b * b
+    if n & 1:
+        return odd, even + odd
+    return even, odd
+
+
+# The same pair, starting from the nearest checkpoint when there is one close enough.
+
+def fib_pair(n):
+    nearest = min(checkpoints, key=lambda k: abs(k - n), default=None)
+    if nearest is not None and abs(nearest - n) <= MAX_WALK:
+        checkpoints.move_to_end(nearest)
+        a, b = checkpoints[nearest]
+        for _ in range(nearest, n):
+            a, b = b, a + b
+        for _ in range(n, nearest):
+            a, b = b - a, a
+    else:
+        a, b = doubling_pair(n)
+
+    checkpoints[n] = a, b
+    checkpoints.move_to_end(n)
+    if len(checkpoints) > MAX_CHECKPOINTS:
+        checkpoints.popitem(last=False)
+    return a, b
+
+
+def fib_number(n):
+    if n < 0:
+        raise ValueError("n must be non-negative, got %d" % n)
+    return fib_pair(n)[0]
+
+
+# The same number from the matrix [[1, 1], [1, 0]] ** n, squared and multiplied by the bits of n.
+
+def fib_matrix(n):
+    if n < 0:
+        raise ValueError("n must be non-negative, got %d" % n)
+    result = (1, 0, 0, 1)
+    power = (1, 1, 1, 0)
+    while n:
+        if n & 1:
+            result = multiply_matrices(result, power)
+        power = multiply_matrices(power, power)
+        n >>= 1
+    return result[1]
+
+
+def multiply_matrices(m, k):
+    return (m[0] * k[0] + m[1] * k[2], m[0] * k[1] + m[1] * k[3],
+            m[2] * k[0] + m[3] * k[2], m[2] * k[1] + m[3] * k[3])
+
+
+# Seeks straight to F(start) and then goes on one addition at a time, up to (not including) stop.
+# Without a stop it never ends, just like fib().
+
+def fib_range(start=0, stop=None):
+    if start < 0:
+        raise ValueError("start must be non-negative, got %d" % start)
+    a, b = fib_pair(start)
+    n = start
+    while stop is None or n < stop:
+        yield a
+        a, b = b, a + b
+        n += 1
+
+
+# The generator from day3.py, starting at F(1) = 1.
+
+def fib():
+    return fib_range(1)
+
+
+# Usage;
+
+"""
+print(fib_number(100))              # 354224848179261915075
+print(list(fib_range(10, 15)))      # [55, 89, 144, 233, 377]
+"""
+
+
+# Benchmark;
+# Time to reach F(n) with the naive generator, fast doubling, a nearby query that starts from the checkpoint of the
+# first one, and the matrix power.
+
+def naive_fib(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def timed(function, n):
+    start = time.perf_counter()
+    value = function(n)
+    return time.perf_counter() - start, value
+
+
+def benchmark(sizes=(1_000, 10_000, 100_000, 1_000_000)):
+    for n in sizes:
+        naive_time, expected = timed(naive_fib, n)
+        checkpoints.clear()
+        cold_time, cold = timed(fib_number, n)
+        warm_time, warm = timed(fib_number, n + 10)
+        matrix_time, matrix = timed(fib_matrix, n)
+        assert cold == expected == matrix and warm == naive_fib(n + 10)
+        print("n=%-9d naive %9.4f s  doubling %9.4f s  nearby %9.6f s  matrix %9.4f s"
+              % (n, naive_time, cold_time, warm_time, matrix_time))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,153 @@
+# Scanning mailboxes for headers;
+# The regex r"^(From|To|Cc).*?python-list@python.org" from day3.py, used on mailbox files of many GB. Instead of reading
+# the file line by line and decoding every line to str, the file is mapped into memory with mmap and a bytes pattern,
+# compiled once, runs over the whole mapping.
+# Matches come out as a stream of (offset, line, address) tuples, where offset is the byte position of the line.
+# To look for many addresses in one pass, the addresses are merged into a single alternation that shares common
+# prefixes (a small trie written as a regex), instead of running one regex per address.
+
+import mmap
+import os
+import re
+import tempfile
+import time
+
+HEADERS = (b'From', b'To', b'Cc')
+DEFAULT_ADDRESS = b'python-list@python.org'
+
+
+# Builds a regex matching exactly the given byte strings, factoring out shared prefixes:
+# [b'ab', b'ac', b'b'] becomes (?:a(?:b|c)|b).
+
+def trie_regex(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for byte in word:
+            node = node.setdefault(byte, {})
+        node[None] = {}
+    return trie_node_regex(trie)
+
+
+def trie_node_regex(node):
+    ends = None in node
+    branches = [re.escape(bytes([byte])) + trie_node_regex(child) for byte, child in sorted(
+        (byte, child) for byte, child in node.items() if byte is not None)]
+    if not branches:
+        return b''
+    pattern = branches[0] if len(branches) == 1 else b'(?:' + b'|'.join(branches) + b')'
+    if ends:
+        # The word may stop here or go on; longer words are tried first
+        return b'(?:' + pattern + b')?'
+    return pattern
+
+
+def header_pattern(addresses=(DEFAULT_ADDRESS,), headers=HEADERS):
+    addresses = [address.encode() if isinstance(address, str) else address for address in addresses]
+    return re.compile(b'(?:' + b'|'.join(map(re.escape, headers)) + b')[^\n]*?'
+                      b'(?P<address>' + trie_regex(addresses) + b')')
+
+
+# With re.MULTILINE, ^(From|To|Cc) has to be tried at every single position of the file. Starting the pattern with a
+# plain newline lets the regex engine skip ahead to the next line break quickly instead, so the scan uses
+# b'\n' + pattern (made once by after_newline and passed in as following) and checks the very first line, which has
+# no newline before it, on its own.
+# start and end limit the scan to part of the buffer; start has to be the beginning of a line.
+
+def after_newline(pattern):
+    return re.compile(b'\n' + pattern.pattern, pattern.flags)
+
+
+def scan_buffer(buffer, pattern, start=0, end=None, following=None):
+    end = len(buffer) if end is None else end
+    following = following or after_newline(pattern)
+    first = pattern.match(buffer, start, end)
+    if first:
+        yield line_match(buffer, first, start)
+    for match in following.finditer(buffer, start, end):
+        yield line_match(buffer, match, match.start() + 1)
+
+
+def line_match(buffer, match, line_start):
+    line_end = buffer.find(b'\n', match.end())
+    if line_end < 0:
+        line_end = len(buffer)
+    return line_start, buffer[line_start:line_end], match.group('address')
+
+
+def scan_file(path, addresses=(DEFAULT_ADDRESS,), pattern=None):
+    pattern = pattern or header_pattern(addresses)
+    following = after_newline(pattern)
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield from scan_buffer(buffer, pattern, following=following)
+
+
+# Usage;
+
+"""
+for offset, line, address in scan_file('archive.mbox'):
+    print(offset, line)
+
+for offset, line, address in scan_file('archive.mbox', ['python-list@python.org', 'python-dev@python.org']):
+    print(offset, address)
+"""
+
+
+# Benchmark;
+# Scans a generated mailbox and reports the throughput in MB/s: line by line, and with scan_file for one address and
+# for large sets of addresses.
+
+def write_mailbox(path, size_mb):
+    message = (b'From someone@example.com Mon Jan  1 00:00:00 2024\n'
+               b'From: Someone <someone@example.com>\n'
+               b'To: python-list@python.org\n'
+               b'Cc: list-%d@example.org\n'
+               b'Subject: hello\n'
+               b'\n'
+               + b'Some body text, most lines of a mailbox are like this one and are not headers at all.\n' * 30
+               + b'It mentions python-list@python.org in passing.\n\n')
+    with open(path, 'wb') as file:
+        written = number = 0
+        while written < size_mb * 2 ** 20:
+            chunk = b''.join(message % (number + i) for i in range(1000))
+            file.write(chunk)
+            written += len(chunk)
+            number += 1000
+
+
+# The way day3.py would do it: one regex match per line.
+
+def time_line_by_line(path, expected):
+    regex = re.compile(rb"^(From|To|Cc).*?python-list@python.org")
+    start = time.perf_counter()
+    with open(path, 'rb') as file:
+        matches = sum(1 for line in file if regex.match(line))
+    elapsed = time.perf_counter() - start
+    assert matches == expected
+    return elapsed
+
+
+def benchmark(size_mb=200, address_counts=(1, 100, 10_000)):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.mbox')
+        write_mailbox(path, size_mb)
+        size = os.path.getsize(path)
+        for count in address_counts:
+            addresses = [DEFAULT_ADDRESS] + [b'list-%d@example.org' % i for i in range(count - 1)]
+            start = time.perf_counter()
+            pattern = header_pattern(addresses)
+            compile_time = time.perf_counter() - start
+            start = time.perf_counter()
+            matches = sum(1 for _ in scan_file(path, pattern=pattern))
+            elapsed = time.perf_counter() - start
+            if count == 1:
+                line_time = time_line_by_line(path, matches)
+                print("line by line     %7.3f s  %8.1f MB/s" % (line_time, size / line_time / 2 ** 20))
+            print("%6d addresses  compile %7.3f s  scan %7.3f s  %8.1f MB/s  %d matches"
+                  % (count, compile_time, elapsed, size / elapsed / 2 ** 20, matches))
+
+
+if __name__ == '__main__':
+    benchmark()
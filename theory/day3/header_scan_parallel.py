@@ -0,0 +1,88 @@
+# Parallel mailbox scan;
+# header_scan.py reads a mailbox with a single process. Here the file is cut into byte ranges that each start at the
+# beginning of a line, and a pool of processes scans the ranges at the same time. Every worker compiles the pattern
+# once, when it starts, and maps the file itself, so only the (start, end) pair of a range travels to it.
+# In ordered mode the matches come back in file order; in unordered mode every range is handed over as soon as it is
+# done, which gives the first results sooner.
+
+import mmap
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from header_scan import DEFAULT_ADDRESS, after_newline, header_pattern, scan_buffer, write_mailbox
+
+RANGE_SIZE = 64 * 2 ** 20
+
+# Set once in every worker by init_worker.
+worker_pattern = None
+worker_following = None
+
+
+def init_worker(addresses):
+    global worker_pattern, worker_following
+    worker_pattern = header_pattern(addresses)
+    worker_following = after_newline(worker_pattern)
+
+
+def scan_range(path, start, end):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        return list(scan_buffer(buffer, worker_pattern, start, end, worker_following))
+
+
+# Cuts the file into ranges of about `size` bytes, moving every cut forward to just after the next newline.
+
+def line_ranges(path, size=RANGE_SIZE):
+    length = os.path.getsize(path)
+    if length == 0:
+        return []
+    ranges = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        start = 0
+        while start < length:
+            newline = buffer.find(b'\n', min(start + size, length) - 1)
+            end = length if newline < 0 else newline + 1
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def parallel_scan(path, addresses=(DEFAULT_ADDRESS,), workers=None, ordered=True, size=RANGE_SIZE):
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=init_worker, initargs=(addresses,)) as pool:
+        futures = [pool.submit(scan_range, path, start, end) for start, end in line_ranges(path, size)]
+        for future in (futures if ordered else as_completed(futures)):
+            yield from future.result()
+
+
+# Usage;
+# ProcessPoolExecutor starts new processes, so scripts using this need the if __name__ == '__main__' guard.
+
+"""
+for offset, line, address in parallel_scan('archive.mbox'):
+    print(offset, line)
+
+for offset, line, address in parallel_scan('archive.mbox', ordered=False):
+    print(offset, line)
+"""
+
+
+# Benchmark;
+# Throughput over a generated mailbox with 1 up to os.cpu_count() workers, in both modes.
+
+def benchmark(size_mb=1024):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.mbox')
+        write_mailbox(path, size_mb)
+        size = os.path.getsize(path)
+        for workers in range(1, os.cpu_count() + 1):
+            for ordered in (True, False):
+                start = time.perf_counter()
+                matches = sum(1 for _ in parallel_scan(path, workers=workers, ordered=ordered))
+                elapsed = time.perf_counter() - start
+                print("%2d workers  %-9s %8.3f s  %8.1f MB/s  %d matches"
+                      % (workers, 'ordered' if ordered else 'unordered', elapsed, size / elapsed / 2 ** 20, matches))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,213 @@
+# Streaming JSON arrays;
+# json.dumps and json.loads need the whole list in memory, and the whole string next to it. For arrays with hundreds
+# of millions of elements, dump_items writes the array to a file while pulling the elements from any iterable, and
+# load_items reads the file back in chunks and yields the top-level elements one by one. Either way only a chunk of
+# text and the current element are held in memory. The text written is the same json.dumps would produce.
+
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import tracemalloc
+
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 1024
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARACTERS = '0123456789.eE+-'
+
+
+# The keyword arguments go to json.JSONEncoder, as with json.dumps; indent is not supported because the
+# elements are written one after the other on a single line.
+
+def dump_items(items, file, batch=BATCH_SIZE, **kwds):
+    if kwds.get('indent') is not None:
+        raise ValueError("dump_items does not support indent")
+    encoder = json.JSONEncoder(**kwds)
+    separator = encoder.item_separator
+    file.write('[')
+    pending = []
+    first = True
+    for item in items:
+        if not first:
+            pending.append(separator)
+        pending.append(encoder.encode(item))
+        first = False
+        if len(pending) >= batch:
+            file.write(''.join(pending))
+            pending = []
+    file.write(''.join(pending))
+    file.write(']')
+
+
+def dumps_items(items, **kwds):
+    out = io.StringIO()
+    dump_items(items, out, **kwds)
+    return out.getvalue()
+
+
+class ArrayReader:
+    def __init__(self, file, chunk_size=CHUNK_SIZE, **kwds):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder(**kwds)
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    # Drops the text already used and appends the next chunk; returns False at the end of the file, where the buffer
+    # is left as it is, so positions found in it stay valid.
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    # The next character that is not whitespace, without consuming it; '' at the end of the file.
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, characters):
+        character = self.peek()
+        if not character or character not in characters:
+            raise json.JSONDecodeError("Expecting one of %r" % characters, self.buffer, self.pos)
+        self.pos += 1
+        return character
+
+    # An element is only trusted once the text after it cannot continue it: "12" or "1." at the end of a chunk may be
+    # the start of "123" or "1.5".
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            following = self.buffer[end:end + 1]
+            if (following and following not in NUMBER_CHARACTERS) or not self.fill():
+                self.pos = end
+                return value
+            # fill() moved the buffer, the element will be decoded again from its new position
+
+    # Like json.loads, nothing but whitespace may follow the closing bracket.
+
+    def end(self):
+        if self.peek():
+            raise json.JSONDecodeError("Extra data", self.buffer, self.pos)
+
+    def __iter__(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            self.end()
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                self.end()
+                return
+
+
+def load_items(file, chunk_size=CHUNK_SIZE, **kwds):
+    return iter(ArrayReader(file, chunk_size, **kwds))
+
+
+def loads_items(text, **kwds):
+    return load_items(io.StringIO(text), **kwds)
+
+
+# Usage;
+
+"""
+with open('payload.json', 'w') as file:
+    dump_items(range(10 ** 8), file)
+
+with open('payload.json') as file:
+    for item in load_items(file):
+        print(item)
+"""
+
+
+# Benchmark;
+# Time and peak memory (tracemalloc) of json.dump/json.load on a whole list against the streaming versions.
+
+def payload(n):
+    for i in range(n):
+        yield i if i % 2 else "item-%d" % i
+
+
+# Texts json.loads rejects; loads_items has to reject them too, also when they are split across chunks.
+MALFORMED = ['[01]', '[1.]', '[1e]', '[1-]', '[1,]', '[,1]', '[1 2]', '[1]junk', '["a]', '[tru]', '[1', '', '[1]]']
+
+
+def check_malformed(chunk_sizes=(1, 2, 3, CHUNK_SIZE)):
+    for text in MALFORMED:
+        for chunk_size in chunk_sizes:
+            try:
+                list(load_items(io.StringIO(text), chunk_size))
+            except json.JSONDecodeError:
+                continue
+            raise AssertionError("load_items accepted %r with chunks of %d" % (text, chunk_size))
+
+
+# tracemalloc slows everything down, so time and memory come from two separate runs.
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def benchmark(sizes=(100_000, 1_000_000, 5_000_000)):
+    check_malformed()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'payload.json')
+
+        def stdlib_dump():
+            with open(path, 'w') as file:
+                json.dump(list(payload(n)), file)
+
+        def stream_dump():
+            with open(path, 'w') as file:
+                dump_items(payload(n), file)
+
+        def stdlib_load():
+            with open(path) as file:
+                for item in json.load(file):
+                    pass
+
+        def stream_load():
+            with open(path) as file:
+                for item in load_items(file):
+                    pass
+
+        for n in sizes:
+            for name, function in (('json.dump', stdlib_dump), ('dump_items', stream_dump),
+                                   ('json.load', stdlib_load), ('load_items', stream_load)):
+                elapsed, peak = measure(function)
+                print("%-10s %9d items  %8.3f s  peak %8.1f MB" % (name, n, elapsed, peak / 2 ** 20))
+            with open(path) as file:
+                assert file.read() == json.dumps(list(payload(n)))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,79 @@
+# Lottery draws in batches;
+# lottery() in day3.py makes seven random.randint calls per draw. To simulate millions of draws we let a NumPy
+# Generator fill whole rows at once: six numbers from 1 to 40 and a bonus number from 1 to 15, one row per draw.
+# The seed can be a number or an existing np.random.Generator, and the same seed always gives the same draws,
+# whether they come one at a time, in blocks, or as a single array.
+
+import random
+import time
+
+import numpy as np
+
+# Upper bounds are exclusive, like in range(); the last column is the bonus number.
+LOW = 1
+HIGHS = np.array([41, 41, 41, 41, 41, 41, 16])
+BLOCK_SIZE = 1 << 16
+
+
+# The single-draw generator, now driven by a seedable Generator instead of the random module.
+
+def lottery(seed=None):
+    rng = np.random.default_rng(seed)
+    for number in rng.integers(LOW, HIGHS):
+        yield int(number)
+
+
+# Yields arrays of at most `block` draws, so memory stays bounded however many draws are asked for.
+# The draws are generated as int64 and stored as uint8, which keeps the sequence independent of the block size.
+
+def lottery_blocks(n, seed=None, block=BLOCK_SIZE):
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, block):
+        yield rng.integers(LOW, HIGHS, size=(min(block, n - start), len(HIGHS))).astype(np.uint8)
+
+
+def lottery_batch(n, seed=None, block=BLOCK_SIZE):
+    draws = np.empty((n, len(HIGHS)), dtype=np.uint8)
+    start = 0
+    for chunk in lottery_blocks(n, seed, block):
+        draws[start:start + len(chunk)] = chunk
+        start += len(chunk)
+    return draws
+
+
+# Usage;
+
+"""
+for random_number in lottery(42):
+    print("And the next number is... %d!" % random_number)
+
+print(lottery_batch(3, seed=42))    # the first row is the draw above
+"""
+
+
+# Benchmark;
+# Draws per second with the original random.randint generator and with the batch API.
+
+def random_lottery():
+    for i in range(6):
+        yield random.randint(1, 40)
+
+    yield random.randint(1, 15)
+
+
+def benchmark(n=10_000_000, python_n=200_000):
+    start = time.perf_counter()
+    for _ in range(python_n):
+        list(random_lottery())
+    elapsed = time.perf_counter() - start
+    print("random.randint  %10d draws  %8.3f s  %12.0f draws/s" % (python_n, elapsed, python_n / elapsed))
+
+    start = time.perf_counter()
+    for _ in lottery_blocks(n, seed=0):
+        pass
+    elapsed = time.perf_counter() - start
+    print("lottery_blocks  %10d draws  %8.3f s  %12.0f draws/s" % (n, elapsed, n / elapsed))
+
+
+if __name__ == '__main__':
+    benchmark()
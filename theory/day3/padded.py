@@ -0,0 +1,129 @@
+# Padded iteration;
+# catch_this() in day3.py reads the_list[i] for i in range(20) and lets IndexError stand in for the missing elements,
+# so a list of 5 raises and catches 15 exceptions. Raising an exception is much slower than reading an element, and
+# with millions of short records most of the time goes there. padded() knows the length of the sequence, so it hands
+# out the elements that are there and then the fill value, without asking for anything past the end:
+#
+#     for number in padded(the_list, 20):
+#         do_stuff_with_number(number)
+#
+# pad_batch() does the same for a whole batch of ragged records at once, into one NumPy array of shape
+# (records, length): all elements are copied in one go and the holes filled with one mask, with no Python loop over
+# the positions. padded_batches() cuts an endless stream of records into such arrays.
+
+import itertools
+import random
+import time
+
+import numpy as np
+
+
+# The first length elements of iterable, followed by fill as often as needed to make length values.
+
+def padded(iterable, length, fill=0):
+    if hasattr(iterable, '__len__') and hasattr(iterable, '__getitem__'):
+        return itertools.chain(itertools.islice(iterable, length), itertools.repeat(fill, length - len(iterable)))
+    return itertools.islice(itertools.chain(iterable, itertools.repeat(fill)), length)
+
+
+# sequence[index], or fill when there is no such element (negative indexes count from the end, as usual).
+
+def get(sequence, index, fill=0):
+    return sequence[index] if -len(sequence) <= index < len(sequence) else fill
+
+
+# The records as rows of a 2-D array: each one cut or padded with fill to length (by default the length of the
+# longest record). dtype is worked out from the values and fill unless given.
+
+def pad_batch(records, length=None, fill=0, dtype=None):
+    records = records if isinstance(records, list) else list(records)
+    lengths = np.fromiter(map(len, records), dtype=np.int64, count=len(records))
+    values = np.array(list(itertools.chain.from_iterable(records)), dtype=dtype)
+    if length is None:
+        length = int(lengths.max()) if len(records) else 0
+    elif len(records) and lengths.max() > length:
+        # Drop the values past length: their position inside their record is too high
+        starts = np.cumsum(lengths) - lengths
+        values = values[np.arange(values.size) - np.repeat(starts, lengths) < length]
+        lengths = np.minimum(lengths, length)
+    if dtype is None:
+        dtype = np.result_type(values, fill) if values.size else np.asarray(fill).dtype
+    result = np.full((len(records), length), fill, dtype=dtype)
+    # True where a row has a value; row-major order matches the order of values
+    result[np.arange(length) < lengths[:, None]] = values
+    return result
+
+
+def padded_batches(records, size, length=None, fill=0, dtype=None):
+    records = iter(records)
+    for batch in iter(lambda: list(itertools.islice(records, size)), []):
+        yield pad_batch(batch, length, fill, dtype)
+
+
+# Usage;
+
+"""
+the_list = (1, 2, 3, 4, 5)
+print(list(padded(the_list, 20)))
+print(get(the_list, 12))
+
+print(pad_batch([(1, 2, 3), (4,), (), (5, 6)]))
+for batch in padded_batches(read_records(), 10_000, length=20):
+    totals = batch.sum(axis=1)
+"""
+
+
+# Benchmark;
+# Reading every record to a fixed length of 20 with the try/except loop of catch_this(), get(), padded() and
+# pad_batch(), for records that are mostly too short (most lookups out of range) and records that are mostly long
+# enough. When few lookups miss, the try/except loop is hard to beat one element at a time.
+
+def catch_this(records, length):
+    total = 0
+    for the_list in records:
+        for i in range(length):
+            try:
+                total += the_list[i]
+            except IndexError:
+                total += 0
+    return total
+
+
+def padded_sum(records, length):
+    total = 0
+    for the_list in records:
+        for number in padded(the_list, length):
+            total += number
+    return total
+
+
+def get_sum(records, length):
+    total = 0
+    for the_list in records:
+        for i in range(length):
+            total += get(the_list, i)
+    return total
+
+
+def batch_sum(records, length):
+    return int(pad_batch(records, length).sum())
+
+
+def benchmark(count=200_000, length=20):
+    rng = random.Random(0)
+    cases = {'mostly short': [tuple(range(rng.randint(0, 6))) for _ in range(count)],
+             'mostly long': [tuple(range(rng.randint(length - 2, length))) for _ in range(count)]}
+    print("%-14s %-12s %12s %14s" % ("records", "method", "seconds", "ns / lookup"))
+    for label, records in cases.items():
+        expected = None
+        for method in (catch_this, get_sum, padded_sum, batch_sum):
+            start = time.perf_counter()
+            total = method(records, length)
+            elapsed = time.perf_counter() - start
+            expected = total if expected is None else expected
+            assert total == expected
+            print("%-14s %-12s %12.3f %14.1f" % (label, method.__name__, elapsed, elapsed / count / length * 1e9))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,289 @@
+# Sweeping a partial function;
+# p = partial(func, 5, 6, 7) in day3.py fixes u, v and w of func(u, v, w, x) and leaves x free. sweep(p, xs) gives
+# the same values as map(p, xs), for as many x as you like:
+#
+#     for value in sweep(p, range(10 ** 9)):
+#         ...
+#
+# The x values are cut into chunks and handed to a pool of processes. The fixed part (func, u, v, w) is sent to every
+# worker once, when it starts, so a task only carries its chunk of x values, and a chunk of a range is sent as a range
+# (three numbers) rather than a list. Only a few chunks per worker are in flight at a time, so xs can be a generator
+# that never ends.
+#
+# Before that, sweep checks whether func only adds, subtracts, multiplies and divides x by numbers, like
+# u*4 + v*3 + w*2 + x. It does so by calling func once with a stand-in for x that records what is done to it and
+# refuses anything else (comparisons, function calls, x * x, ...). If it passes, func is simply called with whole NumPy
+# arrays of x values, one block at a time, which runs the same operations in the same order, so the results are the
+# same numbers as from map(). Int sweeps that could go past 64 bits, and x values mixing ints and floats, are left to
+# the processes. As a last check, a few x values of the first block are also run through p one at a time, and if the
+# answers differ from the array's (p may look at the type of x), the processes take over.
+
+import itertools
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+CHUNK_SIZE = 10_000
+BLOCK_SIZE = 1 << 20
+
+# Chunks in flight per worker.
+AHEAD = 2
+
+# x values of the first vectorized block that are also run through p one by one, to compare.
+SAMPLES = 8
+
+INT_LIMIT = 2 ** 63
+
+
+class NotAffine(Exception):
+    pass
+
+
+# Stands in for x: slope * x + intercept. Every value it takes on the way is noted in trace, so the largest number
+# met in the calculation can be worked out for any x.
+
+class Affine:
+    def __init__(self, slope, intercept, trace):
+        self.slope = slope
+        self.intercept = intercept
+        self.trace = trace
+        trace.append(self)
+
+    def combine(self, slope, intercept):
+        return Affine(slope, intercept, self.trace)
+
+    def __add__(self, other):
+        if isinstance(other, Affine) and other.trace is self.trace:
+            return self.combine(self.slope + other.slope, self.intercept + other.intercept)
+        if not is_number(other):
+            return NotImplemented
+        return self.combine(self.slope, self.intercept + other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -other
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        if isinstance(other, Affine):
+            raise NotAffine("x is multiplied by x")
+        if not is_number(other):
+            return NotImplemented
+        return self.combine(self.slope * other, self.intercept * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Affine):
+            raise NotAffine("x is divided by x")
+        if not is_number(other):
+            return NotImplemented
+        return self.combine(self.slope / other, self.intercept / other)
+
+    def __neg__(self):
+        return self.combine(-self.slope, -self.intercept)
+
+    def __pos__(self):
+        return self
+
+    def __bool__(self):
+        raise NotAffine("x is compared or tested")
+
+    def __eq__(self, other):
+        raise NotAffine("x is compared")
+
+    def __ne__(self, other):
+        raise NotAffine("x is compared")
+
+    __hash__ = None
+
+
+def is_number(value):
+    return type(value) in (int, float)
+
+
+# The trace of p with x as the stand-in, or None when p does more than affine arithmetic with x.
+
+def trace_affine(p):
+    trace = []
+    try:
+        result = p(Affine(1, 0, trace))
+    except Exception:
+        return None
+    if not isinstance(result, Affine):
+        return None
+    return trace
+
+
+# The largest number any step of the calculation can reach for |x| <= largest_x.
+
+def largest_step(trace, largest_x):
+    return max(abs(step.slope) * largest_x + abs(step.intercept) for step in trace)
+
+
+# p applied to a block of x values as an array, or None where NumPy could give other numbers than Python: ints must
+# stay within 64 bits, and ints that meet a float must be small enough to turn into floats exactly, as NumPy converts
+# the whole array before it divides or multiplies while Python works on exact ints.
+
+def vector_block(p, trace, values):
+    if values.dtype.kind not in 'iuf':
+        return None
+    if values.dtype.kind in 'iu':
+        floats = any(type(step.slope) is float or type(step.intercept) is float for step in trace)
+        largest_x = int(np.abs(values).max()) if values.size else 0
+        if largest_step(trace, largest_x) >= (2 ** 53 if floats else INT_LIMIT):
+            return None
+    try:
+        return p(values)
+    except Exception:
+        return None
+
+
+# Whether the vectorized result agrees with p called on a few of the x values themselves. The trace only sees what
+# p does to a stand-in, so a p that looks at the type of x (isinstance(x, int), ...) can take another path for real
+# numbers or arrays.
+
+def same_as_map(p, values, result):
+    if not isinstance(result, np.ndarray) or result.shape != (len(values),):
+        return False
+    for index in sorted(set(np.linspace(0, len(values) - 1, SAMPLES).astype(int).tolist())):
+        expected, got = p(values[index]), result[index].item()
+        if type(expected) is not type(got) or not (expected == got or expected != expected and got != got):
+            return False
+    return True
+
+
+# Set once in every worker by init_worker and only read afterwards.
+worker_partial = None
+
+
+# A block of x values as an array, or None when they are not all ints or all floats: np.asarray would turn a mix
+# into float64 and round ints above 2 ** 53, where Python keeps them exact.
+
+def block_array(values):
+    if isinstance(values, range):
+        return np.arange(values.start, values.stop, values.step)
+    if set(map(type, values)) not in ({int}, {float}):
+        return None
+    try:
+        return np.asarray(values)
+    except OverflowError:
+        return None
+
+
+def init_worker(func, args, keywords):
+    global worker_partial
+    worker_partial = partial(func, *args, **keywords)
+
+
+def call_chunk(chunk):
+    return list(map(worker_partial, chunk))
+
+
+def chunks_of(xs, size):
+    if isinstance(xs, range):
+        return (xs[start:start + size] for start in range(0, len(xs), size))
+    iterator = iter(xs)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+
+def pool_blocks(p, xs, workers, chunksize):
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(p.func, p.args, p.keywords)) as pool:
+        running = deque()
+        for chunk in chunks_of(xs, chunksize):
+            running.append(pool.submit(call_chunk, chunk))
+            if len(running) >= workers * AHEAD:
+                yield running.popleft().result()
+        while running:
+            yield running.popleft().result()
+
+
+def vector_blocks(p, trace, xs, block, workers, chunksize):
+    xs = xs if isinstance(xs, range) else iter(xs)
+    done = 0
+    for values in chunks_of(xs, block):
+        array = block_array(values)
+        result = vector_block(p, trace, array) if array is not None else None
+        if result is not None and done == 0 and not same_as_map(p, values, result):
+            result = None
+        if result is None:
+            # From here on the processes take over, rather than starting a pool for every block
+            rest = xs[done:] if isinstance(xs, range) else itertools.chain(values, xs)
+            yield from pool_blocks(p, rest, workers, chunksize)
+            return
+        done += len(values)
+        yield result
+
+
+# The results in order, one list (from the pool) or NumPy array (from the vectorized path) at a time.
+
+def sweep_blocks(p, xs, workers=None, chunksize=CHUNK_SIZE, block=BLOCK_SIZE, vectorize=True):
+    if not isinstance(p, partial):
+        raise TypeError("sweep needs a functools.partial, got %r" % type(p).__name__)
+    trace = trace_affine(p) if vectorize else None
+    if trace is None:
+        return pool_blocks(p, xs, workers, chunksize)
+    return vector_blocks(p, trace, xs, block, workers, chunksize)
+
+
+def sweep(p, xs, workers=None, chunksize=CHUNK_SIZE, block=BLOCK_SIZE, vectorize=True):
+    for values in sweep_blocks(p, xs, workers, chunksize, block, vectorize):
+        yield from values.tolist() if isinstance(values, np.ndarray) else values
+
+
+# Usage;
+# The pool starts new processes, so scripts using sweep need the if __name__ == '__main__' guard, and func must be
+# defined at the top of a module so the workers can find it.
+
+"""
+def func(u, v, w, x):
+    return u*4 + v*3 + w*2 + x
+
+
+p = partial(func, 5, 6, 7)
+print(list(sweep(p, range(10))))
+print(sum(block.sum() for block in sweep_blocks(p, range(10 ** 9))))
+"""
+
+
+# Benchmark;
+# Nanoseconds per x for map(p, xs), sweep through the process pool and sweep on NumPy arrays, with the function from
+# day3.py and one that is not affine (it uses %), which always goes to the pool.
+
+def func(u, v, w, x):
+    return u*4 + v*3 + w*2 + x
+
+
+def wrapped(u, v, w, x):
+    return u*4 + v*3 + w*2 + x % 1000
+
+
+def benchmark(sizes=(100_000, 1_000_000, 10_000_000)):
+    print("%-10s %12s %12s %12s %12s" % ("function", "x values", "map ns", "pool ns", "numpy ns"))
+    for function in (func, wrapped):
+        p = partial(function, 5, 6, 7)
+        for n in sizes:
+            xs = range(n)
+            expected = sum(map(p, xs))
+            timings = []
+            for run in (lambda: sum(map(p, xs)),
+                        lambda: sum(sum(values) for values in sweep_blocks(p, xs, vectorize=False)),
+                        lambda: sum(int(values.sum()) if isinstance(values, np.ndarray) else sum(values)
+                                    for values in sweep_blocks(p, xs))):
+                start = time.perf_counter_ns()
+                total = run()
+                timings.append((time.perf_counter_ns() - start) / n)
+                assert total == expected
+            print("%-10s %12d %12.1f %12.1f %12.1f" % ((function.__name__, n) + tuple(timings)))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,181 @@
+# Serializers;
+# day3.py shows json and pickle side by side. Which one is best depends on the message: json is readable and portable,
+# pickle handles any Python object, pickle protocol 5 can hand big NumPy buffers over without copying them into the
+# pickle stream, and a plain list of numbers is smallest as raw machine values. This module puts all of them behind
+# one dumps/loads pair. dumps writes a one-byte tag in front of the payload, so loads knows which back end to use.
+
+import array
+import json
+import pickle
+import struct
+import sys
+import time
+
+# Tag byte -> serializer and name -> serializer, filled in by the @register decorator.
+SERIALIZERS = {}
+NAMES = {}
+
+
+def register(serializer_class):
+    serializer = serializer_class()
+    SERIALIZERS[serializer.tag] = serializer
+    NAMES[serializer.name] = serializer
+    return serializer_class
+
+
+@register
+class JsonSerializer:
+    name = 'json'
+    tag = b'J'
+
+    def dump_parts(self, obj):
+        return [json.dumps(obj, separators=(',', ':')).encode()]
+
+    def loads(self, data):
+        return json.loads(bytes(data))
+
+
+@register
+class PickleSerializer:
+    name = 'pickle'
+    tag = b'P'
+
+    def dump_parts(self, obj):
+        return [pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)]
+
+    def loads(self, data):
+        return pickle.loads(data)
+
+
+# Protocol 5 with out-of-band buffers: large buffers (NumPy arrays, bytearrays wrapped in pickle.PickleBuffer) are kept
+# out of the pickle stream and written after it as they are. Layout:
+#   number of buffers (uint32), length of the pickle stream and of every buffer (uint64 each), stream, buffers.
+# loads hands the buffers to pickle as memoryview slices of the input, so arrays are rebuilt without another copy.
+# They share the input's memory, so arrays loaded from bytes are read-only (the pickle back end gives writable ones);
+# loads(bytearray(data)) copies once and gives writable arrays.
+
+@register
+class Pickle5Serializer:
+    name = 'pickle5'
+    tag = b'5'
+
+    def dump_parts(self, obj):
+        buffers = []
+        stream = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+        header = struct.pack('<I%dQ' % (len(raws) + 1), len(raws), len(stream), *(raw.nbytes for raw in raws))
+        return [header, stream] + raws
+
+    def loads(self, data):
+        view = memoryview(data)
+        count, = struct.unpack_from('<I', view)
+        lengths = struct.unpack_from('<%dQ' % (count + 1), view, 4)
+        pos = 4 + 8 * (count + 1)
+        parts = []
+        for length in lengths:
+            parts.append(view[pos:pos + length])
+            pos += length
+        return pickle.loads(parts[0], buffers=parts[1:])
+
+
+# Lists that hold only ints (that fit in 64 bits) or only floats, stored as one array.array of machine values.
+# The values are always written little-endian, whatever the machine.
+
+@register
+class NumericSerializer:
+    name = 'numeric'
+    tag = b'N'
+
+    def dump_parts(self, obj):
+        types = set(map(type, obj))
+        try:
+            if types <= {int}:
+                values = array.array('q', obj)
+            elif types == {float}:
+                values = array.array('d', obj)
+            else:
+                raise TypeError
+        except (TypeError, OverflowError):
+            raise TypeError("the numeric serializer only handles lists of ints or lists of floats") from None
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return [values.typecode.encode(), values.tobytes()]
+
+    def loads(self, data):
+        values = array.array(chr(data[0]))
+        values.frombytes(data[1:])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values.tolist()
+
+
+def dump_parts(obj, format='json'):
+    try:
+        serializer = NAMES[format]
+    except KeyError:
+        raise ValueError("unknown format %r, expected one of %s" % (format, sorted(NAMES))) from None
+    return [serializer.tag] + serializer.dump_parts(obj)
+
+
+def dumps(obj, format='json'):
+    return b''.join(dump_parts(obj, format))
+
+
+def loads(data):
+    data = memoryview(data)
+    tag = bytes(data[:1])
+    if tag not in SERIALIZERS:
+        raise ValueError("unknown serializer tag %r" % tag)
+    return SERIALIZERS[tag].loads(data[1:])
+
+
+# Usage;
+
+"""
+data = dumps([1, 2, 3, "a", "b", "c"])                  # json
+print(loads(data))
+print(loads(dumps([1.5, 2.5, 3.5], format='numeric')))
+"""
+
+
+# Benchmark;
+# For every payload shape and every back end that can handle it: encode and decode latency, encode throughput
+# (bytes produced per second) and the size of the output.
+
+def payloads():
+    import numpy as np
+
+    return {
+        'small mixed list': [1, 2, 3, "a", "b", "c"],
+        '1M ints': list(range(1_000_000)),
+        '1M floats': [i / 7 for i in range(1_000_000)],
+        '10k records': [{"id": i, "name": "user-%d" % i, "score": i * 0.5} for i in range(10_000)],
+        'numpy 8 MB': np.arange(1_000_000, dtype=np.float64),
+    }
+
+
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark(repeat=5):
+    print("%-17s %-8s %12s %12s %10s %12s" % ("payload", "format", "encode us", "decode us", "MB/s", "bytes"))
+    for shape, payload in payloads().items():
+        for format in NAMES:
+            try:
+                encode, data = best_time(lambda: dumps(payload, format), repeat)
+            except TypeError:
+                print("%-17s %-8s %12s" % (shape, format, "n/a"))
+                continue
+            decode, result = best_time(lambda: loads(data), repeat)
+            print("%-17s %-8s %12.1f %12.1f %10.1f %12d"
+                  % (shape, format, encode * 1e6, decode * 1e6, len(data) / encode / 2 ** 20, len(data)))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,245 @@
+# Sketches;
+# set("my name is Eric ...".split()) in day3.py and the basket in day9.py keep every distinct item in memory, which is
+# what 'orange' in basket and len(basket) need to be exact. For billions of tokens that is too much, and two
+# sketches can answer the same questions in a fixed amount of memory, at the price of a small, known error:
+#
+#     seen = BloomFilter(capacity=10 ** 9, error_rate=0.001)     # 'orange' in seen: never wrong when it says False,
+#                                                                 # wrong with about this probability when it says True
+#     distinct = HyperLogLog(precision=14)                       # len(distinct): off by about 1% (16 KB)
+#
+# Both take items from any iterable with update(), and two sketches of the same shape, filled by different workers,
+# can be merged into one that is the same as if one sketch had seen all the items.
+#
+# Items are hashed in batches with NumPy: every item is taken as text (bytes byte by byte, anything else that is not
+# a str through str()), and the characters of items of about the same length run through FNV-1a side by side. The
+# item's type is mixed in before the splitmix64 finalizer, so 1, '1' and b'1' are three different items. Unlike
+# hash(), the result is the same in every process, which is what makes the merging work.
+
+import itertools
+import math
+import random
+import sys
+import time
+import zlib
+
+import numpy as np
+
+BATCH_SIZE = 1 << 16
+
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+
+# Type -> number mixed into the hashes of its items; str is 0, the others come from the type's name.
+type_tags = {str: 0}
+
+
+def type_tag(kind):
+    if kind not in type_tags:
+        type_tags[kind] = zlib.crc32(('%s.%s' % (kind.__module__, kind.__qualname__)).encode()) + 1
+    return type_tags[kind]
+
+
+def as_text(item):
+    if isinstance(item, str):
+        return item
+    return item.decode('latin-1') if isinstance(item, bytes) else str(item)
+
+
+def mix(hashes):
+    # splitmix64 finalizer: every input bit affects every output bit
+    hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def fnv(hashes, texts, lengths):
+    # One row of code points per text, padded with zeros; positions past the end of a text leave its hash alone
+    table = np.array(texts, dtype='U%d' % lengths.max()).view(np.uint32).reshape(len(texts), -1)
+    for column in range(table.shape[1]):
+        inside = lengths > column
+        hashes = np.where(inside, (hashes ^ table[:, column]) * FNV_PRIME, hashes)
+    return hashes
+
+
+# 64-bit hashes of a list of items. Items are grouped by the bit length of their length, so the padding of a group is
+# less than its own characters and one long item does not widen the table of the whole batch.
+
+def hash_items(items):
+    kinds = list(map(type, items))
+    tags = None
+    if set(kinds) != {str}:
+        items = [as_text(item) for item in items]
+        tags = np.fromiter(map(type_tag, kinds), dtype=np.uint64, count=len(items))
+    lengths = np.fromiter(map(len, items), dtype=np.int64, count=len(items))
+    hashes = np.full(len(items), FNV_OFFSET, dtype=np.uint64) ^ lengths.astype(np.uint64)
+    groups = np.frexp(lengths.astype(np.float64))[1]
+    for group in np.unique(groups):
+        if group == 0:
+            continue  # empty items
+        where = np.flatnonzero(groups == group)
+        hashes[where] = fnv(hashes[where], [items[index] for index in where.tolist()], lengths[where])
+    return mix(hashes if tags is None else hashes ^ tags)
+
+
+def batches(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    return iter(lambda: list(itertools.islice(iterator, size)), [])
+
+
+# Bloom filter: bits bits, and every item sets the hashes bits given by double hashing, position h1 + i * h2.
+# An item is reported as present when all its bits are set, which for an item never added happens with about the
+# probability error_rate once capacity items are in.
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1, got %r" % error_rate)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.words = np.zeros(-(-self.bits // 64), dtype=np.uint64)
+        self.added = 0
+
+    def positions(self, hashes):
+        # (items, self.hashes) bit positions
+        second = mix(hashes ^ np.uint64(0x9e3779b97f4a7c15)) | np.uint64(1)
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        return (hashes[:, None] + steps * second[:, None]) % np.uint64(self.bits)
+
+    def update(self, iterable):
+        for batch in batches(iterable):
+            positions = self.positions(hash_items(batch)).ravel()
+            np.bitwise_or.at(self.words, positions >> np.uint64(6), np.uint64(1) << (positions & np.uint64(63)))
+            self.added += len(batch)
+
+    def add(self, item):
+        self.update([item])
+
+    def contains(self, items):
+        # One bool per item
+        positions = self.positions(hash_items(list(items)))
+        bits = (self.words[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)
+        return bits.all(axis=1)
+
+    def __contains__(self, item):
+        return bool(self.contains([item])[0])
+
+    def merge(self, other):
+        if (self.bits, self.hashes) != (other.bits, other.hashes):
+            raise ValueError("only filters made with the same capacity and error_rate can be merged")
+        self.words |= other.words
+        self.added += other.added
+
+    @property
+    def nbytes(self):
+        return self.words.nbytes
+
+
+# HyperLogLog: the first precision bits of a hash pick one of 2 ** precision registers, and the register keeps the
+# longest run of leading zeros (plus one) seen in the rest of the hash. Many distinct items make long runs likely, so
+# the registers together estimate the number of distinct items, within about 1.04 / sqrt(2 ** precision).
+
+class HyperLogLog:
+    def __init__(self, precision=14):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18, got %r" % precision)
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, iterable):
+        rest_bits = 64 - self.precision
+        for batch in batches(iterable):
+            hashes = hash_items(batch)
+            index = (hashes >> np.uint64(rest_bits)).astype(np.intp)
+            rest = hashes & np.uint64((1 << rest_bits) - 1)
+            # rest < 2 ** 50 converts to float exactly, and frexp gives its bit length
+            bit_length = np.frexp(rest.astype(np.float64))[1]
+            np.maximum.at(self.registers, index, (rest_bits - bit_length + 1).astype(np.uint8))
+
+    def add(self, item):
+        self.update([item])
+
+    def __len__(self):
+        registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / registers)
+        estimate = alpha * registers ** 2 / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * registers and zeros:
+            # Few items: count the empty registers instead (linear counting)
+            estimate = registers * math.log(registers / zeros)
+        return int(round(estimate))
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError("only sketches with the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    @property
+    def nbytes(self):
+        return self.registers.nbytes
+
+
+# Usage;
+
+"""
+basket = BloomFilter(capacity=1000, error_rate=0.001)
+basket.update(['apple', 'orange', 'apple', 'pear', 'orange', 'banana'])
+print('orange' in basket, 'crabgrass' in basket)
+
+words = HyperLogLog()
+words.update("my name is Eric and Eric is my name".split())
+print(len(words))
+
+other_worker = HyperLogLog()
+other_worker.update(["a", "brand", "new", "name"])
+words.merge(other_worker)
+"""
+
+
+# Benchmark;
+# A stream of tokens with distinct different ones: memory of a set (its table and the token strings) against a Bloom
+# filter for that many tokens and a HyperLogLog, time per token to insert and to look up, the false positive rate of
+# the filter on tokens never inserted, and how far len() of the HyperLogLog is off.
+
+def benchmark(tokens=2_000_000, distinct=1_000_000, error_rate=0.01):
+    rng = random.Random(0)
+    stream = ["token-%d" % rng.randrange(distinct) for _ in range(tokens)]
+    strangers = ["stranger-%d" % number for number in range(200_000)]
+
+    start = time.perf_counter()
+    exact = set(stream)
+    set_insert = time.perf_counter() - start
+    start = time.perf_counter()
+    found = sum(token in exact for token in stream[:200_000])
+    set_lookup = time.perf_counter() - start
+    set_bytes = sys.getsizeof(exact) + sum(map(sys.getsizeof, exact))
+
+    bloom = BloomFilter(len(exact), error_rate)
+    start = time.perf_counter()
+    bloom.update(stream)
+    bloom_insert = time.perf_counter() - start
+    start = time.perf_counter()
+    assert bloom.contains(stream[:200_000]).sum() == found
+    bloom_lookup = time.perf_counter() - start
+    false_positives = bloom.contains(strangers).mean()
+
+    counter = HyperLogLog()
+    start = time.perf_counter()
+    counter.update(stream)
+    hll_insert = time.perf_counter() - start
+
+    print("%-12s %12s %14s %14s  %s" % ("structure", "MB", "insert ns", "lookup ns", "accuracy"))
+    print("%-12s %12.2f %14.1f %14.1f  exact, %d distinct"
+          % ("set", set_bytes / 2 ** 20, set_insert / tokens * 1e9, set_lookup / 200_000 * 1e9, len(exact)))
+    print("%-12s %12.2f %14.1f %14.1f  false positives %.4f (asked for %.4f)"
+          % ("bloom", bloom.nbytes / 2 ** 20, bloom_insert / tokens * 1e9, bloom_lookup / 200_000 * 1e9,
+             false_positives, error_rate))
+    print("%-12s %12.4f %14.1f %14s  len %d, off by %.2f%%"
+          % ("hyperloglog", counter.nbytes / 2 ** 20, hll_insert / tokens * 1e9, "-", len(counter),
+             abs(len(counter) - len(exact)) / len(exact) * 100))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -140,6 +140,8 @@ def return_num(num):
 # Now return_num is decorated and reassigned into itself
 return_num(5)  # should return 15
 
+# memoize.py builds a caching decorator in this same style: @memoize(max_entries, ttl, policy).
+
 # You can do anything you want with the old function, even completely ignore it!
 # Advanced decorators can also manipulate the doc string and argument number.
 
@@ -174,6 +176,9 @@ def first_letter(word):
 print(first_letter('Hello World'))
 first_letter(['Not', 'A', 'String'])
 
+# timing.py has a decorator in the same style, @timed(), that keeps call counts and latency histograms.
+# type_enforce.py checks every annotated parameter instead, and raises TypeError rather than printing "Bad Type".
+
 # Map, Filter, Reduce;
 # Map, Filter, and Reduce are paradigms of functional programming. They allow the programmer (you) to write simpler,
 # shorter code, without neccessarily needing to bother about intricacies like loops and branching.
@@ -182,6 +187,9 @@ first_letter(['Not', 'A', 'String'])
 # needs to be imported as it resides in the functools module. Let's get a better understanding of how they all work,
 # starting with map.
 
+# parallel.py has pmap, pfilter and preduce, which take the same arguments and spread the work over a pool.
+# stream.py chains map, filter and reduce lazily, so no list is built between the steps.
+
 # Map;
 # The map() function in python has the following syntax:
 # map(func, *iterables)
@@ -378,6 +386,7 @@ print(result)
 # The result, as you'll expect, is 78 because reduce, initially, uses 10 as the first argument to custom_sum.
 
 # Nice exercise
+# vectorized.py has vmap, vfilter and vreduce, which run lambdas like these as NumPy calls over the whole list.
 
 from functools import reduce
 
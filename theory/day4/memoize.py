@@ -0,0 +1,237 @@
+# Memoization;
+# The decorators in day4.py run the old function again on every call. memoize remembers the results instead, in the
+# same parameterized style as multiply(multiplier):
+#
+#     @memoize(max_entries=1000, ttl=60, policy='lru')
+#     def slow_square(num):
+#         return num * num
+#
+# The cache keeps at most max_entries results. When it is full, 'lru' evicts the entry used least recently and 'lfu'
+# the entry used least often. With a ttl (in seconds) a result is only reused for that long. The counters are in
+# slow_square.stats, and when several threads ask for the same arguments at once, only one of them runs the function
+# while the others wait for its result.
+
+import random
+import threading
+import time
+from collections import OrderedDict
+
+POLICIES = ('lru', 'lfu')
+
+# Sits between the positional and the keyword arguments of a key, so f(1, a=2) and f((1,), (('a', 2),)) differ.
+KWD_MARK = object()
+
+
+class LRUCache:
+    def __init__(self):
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+
+    def remove(self, key):
+        del self.entries[key]
+
+    def evict(self):
+        self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+
+# Keys are grouped by how often they were used, so the least frequently used key (the oldest among equals) is found
+# without searching the whole cache.
+
+class LFUCache:
+    def __init__(self):
+        self.entries = {}
+        self.counts = {}
+        self.buckets = {}
+        self.lowest = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def touch(self, key):
+        count = self.counts[key]
+        bucket = self.buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[count]
+            if self.lowest == count:
+                self.lowest = count + 1
+        self.counts[key] = count + 1
+        self.buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.touch(key)
+        return entry
+
+    def put(self, key, entry):
+        if key in self.entries:
+            self.entries[key] = entry
+            self.touch(key)
+            return
+        self.entries[key] = entry
+        self.counts[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.lowest = 1
+
+    def remove(self, key):
+        count = self.counts.pop(key)
+        del self.entries[key]
+        del self.buckets[count][key]
+        if not self.buckets[count]:
+            del self.buckets[count]
+            if self.buckets and self.lowest == count:
+                self.lowest = min(self.buckets)
+
+    def evict(self):
+        key = next(iter(self.buckets[self.lowest]))
+        self.remove(key)
+
+    def clear(self):
+        self.__init__()
+
+
+def make_key(args, kwds):
+    if not kwds:
+        return args
+    key = args + (KWD_MARK,)
+    for item in sorted(kwds.items()):
+        key += item
+    return key
+
+
+def memoize(max_entries=128, ttl=None, policy='lru'):
+    if policy not in POLICIES:
+        raise ValueError("policy must be one of %s, got %r" % (POLICIES, policy))
+    if max_entries < 1:
+        raise ValueError("max_entries must be at least 1, got %r" % max_entries)
+
+    def memoize_generator(old_function):
+        cache = LRUCache() if policy == 'lru' else LFUCache()
+        stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        lock = threading.Lock()
+        running = {}  # key -> threading.Event of the call computing it
+
+        def lookup(key):
+            # Called with the lock held; returns (True, value) for a usable entry.
+            entry = cache.get(key)
+            if entry is None:
+                return False, None
+            value, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                cache.remove(key)
+                stats['expirations'] += 1
+                return False, None
+            return True, value
+
+        def new_function(*args, **kwds):
+            key = make_key(args, kwds)
+            try:
+                hash(key)
+            except TypeError:
+                # Unhashable arguments cannot be cached
+                with lock:
+                    stats['misses'] += 1
+                return old_function(*args, **kwds)
+
+            while True:
+                with lock:
+                    found, value = lookup(key)
+                    if found:
+                        stats['hits'] += 1
+                        return value
+                    done = running.get(key)
+                    if done is None:
+                        stats['misses'] += 1
+                        done = running[key] = threading.Event()
+                        break
+                # Someone else is computing this key; wait and look again (if it failed, we try ourselves)
+                done.wait()
+
+            try:
+                value = old_function(*args, **kwds)
+                with lock:
+                    # Make room first, so a new entry is never the one evicted
+                    while key not in cache and len(cache) >= max_entries:
+                        cache.evict()
+                        stats['evictions'] += 1
+                    expires = None if ttl is None else time.monotonic() + ttl
+                    cache.put(key, (value, expires))
+                return value
+            finally:
+                with lock:
+                    del running[key]
+                done.set()
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+
+        new_function.stats = stats
+        new_function.cache_clear = cache_clear
+        new_function.__name__ = old_function.__name__
+        new_function.__doc__ = old_function.__doc__
+        return new_function
+    return memoize_generator
+
+
+# Usage;
+
+"""
+@memoize(max_entries=2, policy='lfu')
+def times2(num):
+    return num * 2
+
+
+times2(2)
+times2(2)
+print(times2.stats)     # {'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 0}
+"""
+
+
+# Benchmark;
+# A slow function called with a skewed mix of arguments, plain and memoized with each policy.
+
+def benchmark(calls=200_000, distinct=5_000, max_entries=1_000):
+    def slow_square(num):
+        total = 0
+        for _ in range(200):
+            total += num * num
+        return total // 200
+
+    rng = random.Random(0)
+    arguments = [int(rng.paretovariate(0.6)) % distinct for _ in range(calls)]
+    functions = [('plain', slow_square)] + [
+        (policy, memoize(max_entries, policy=policy)(slow_square)) for policy in POLICIES]
+    for name, function in functions:
+        start = time.perf_counter()
+        for num in arguments:
+            function(num)
+        elapsed = time.perf_counter() - start
+        stats = getattr(function, 'stats', '')
+        print("%-6s %8.3f s  %6.2f us/call  %s" % (name, elapsed, elapsed / calls * 1e6, stats))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,173 @@
+# Parallel map, filter and reduce;
+# map(), filter() and reduce() in day4.py handle one element at a time in one thread. pmap, pfilter and preduce take
+# the same arguments, but cut the input into chunks and hand the chunks to a pool of threads or processes:
+#
+#     uppered_pets = list(pmap(str.upper, my_pets))
+#     over_75 = list(pfilter(is_a_student, scores))
+#     result = preduce(custom_sum, numbers, 10)
+#
+# The results come back in the order of the input, so they are the same as with the builtins. preduce reduces every
+# chunk on its own and then combines the partial results pairwise, like a tree; that only gives the same answer when
+# func is associative (custom_sum and multiplication are, subtraction is not).
+#
+# pool='thread' suits functions that wait (for files, the network) or release the GIL; pure Python work that keeps
+# the CPU busy needs pool='process', and then func must be picklable: a function defined with def at the top of a
+# module or a builtin like str.upper, not a lambda. The pools are started on first use and kept for later calls.
+
+import atexit
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import reduce
+
+POOLS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+
+# Chunks per worker: more than one, so a worker that finishes early can pick up another chunk.
+CHUNKS_PER_WORKER = 4
+
+# (pool kind, workers) -> running executor.
+pools = {}
+
+missing = object()
+
+
+def get_pool(pool, workers):
+    if isinstance(pool, Executor):
+        return pool
+    if pool not in POOLS:
+        raise ValueError("pool must be one of %s or an Executor, got %r" % (sorted(POOLS), pool))
+    key = (pool, workers or os.cpu_count())
+    if key not in pools:
+        pools[key] = POOLS[pool](key[1])
+    return pools[key]
+
+
+@atexit.register
+def shutdown():
+    for executor in pools.values():
+        executor.shutdown()
+    pools.clear()
+
+
+def chunk_size(length, workers):
+    return max(1, -(-length // ((workers or os.cpu_count()) * CHUNKS_PER_WORKER)))
+
+
+def split(items, chunksize):
+    return [items[start:start + chunksize] for start in range(0, len(items), chunksize)]
+
+
+# The work done for one chunk; these live at the top of the module so a process pool can pickle them.
+
+def map_chunk(func, columns):
+    return list(map(func, *columns))
+
+
+def filter_chunk(func, items):
+    return list(filter(func, items))
+
+
+def reduce_chunk(func, items):
+    return reduce(func, items)
+
+
+def pmap(func, *iterables, pool='thread', workers=None, chunksize=None):
+    # Like map(), stops at the end of the shortest iterable
+    rows = list(zip(*iterables))
+    executor = get_pool(pool, workers)
+    chunks = split(rows, chunksize or chunk_size(len(rows), workers))
+    results = executor.map(map_chunk, [func] * len(chunks), [list(zip(*chunk)) for chunk in chunks])
+    return (value for chunk in results for value in chunk)
+
+
+def pfilter(func, iterable, pool='thread', workers=None, chunksize=None):
+    items = list(iterable)
+    executor = get_pool(pool, workers)
+    chunks = split(items, chunksize or chunk_size(len(items), workers))
+    results = executor.map(filter_chunk, [func] * len(chunks), chunks)
+    return (value for chunk in results for value in chunk)
+
+
+def preduce(func, iterable, initial=missing, pool='thread', workers=None, chunksize=None):
+    items = list(iterable)
+    if not items:
+        if initial is missing:
+            raise TypeError("reduce() of empty iterable with no initial value")
+        return initial
+    executor = get_pool(pool, workers)
+    chunks = split(items, chunksize or chunk_size(len(items), workers))
+    partials = list(executor.map(reduce_chunk, [func] * len(chunks), chunks))
+    # Neighbours are combined pairwise, so the order of the operands never changes
+    while len(partials) > 1:
+        pairs = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        partials = [func(*pair) if len(pair) == 2 else pair[0] for pair in pairs]
+    if initial is missing:
+        return partials[0]
+    return func(initial, partials[0])
+
+
+# Usage;
+# A process pool starts new processes, so scripts using pool='process' need the if __name__ == '__main__' guard.
+
+"""
+my_pets = ['alfred', 'tabitha', 'william', 'arla']
+print(list(pmap(str.upper, my_pets)))
+
+circle_areas = [3.56773, 5.57668, 4.00914, 56.24241, 9.01344, 32.00013]
+print(list(pmap(round, circle_areas, range(1, 7))))
+
+print(preduce(custom_sum, [3, 4, 6, 9, 34, 12], 10, pool='process'))
+"""
+
+
+# Benchmark;
+# A CPU-bound function over many inputs: the builtins, then each parallel version with a thread pool and with 1 up to
+# os.cpu_count() processes. Threads only help when the function releases the GIL, so they show the cost of the
+# chunking itself.
+
+def collatz_steps(num):
+    steps = 0
+    while num != 1:
+        num = num // 2 if num % 2 == 0 else 3 * num + 1
+        steps += 1
+    return steps
+
+
+def is_long_chain(num):
+    return collatz_steps(num) > 100
+
+
+def longest(first, second):
+    return first if collatz_steps(first) >= collatz_steps(second) else second
+
+
+def benchmark(n=100_000):
+    numbers = range(1, n + 1)
+    runs = [('builtin', None, None), ('thread', 'thread', None)]
+    runs.extend(('process x%d' % workers, 'process', workers) for workers in range(1, os.cpu_count() + 1))
+    expected = None
+    print("%-12s %10s %10s %10s" % ("pool", "map s", "filter s", "reduce s"))
+    for label, pool, workers in runs:
+        if pool is None:
+            tasks = (lambda: list(map(collatz_steps, numbers)),
+                     lambda: list(filter(is_long_chain, numbers)),
+                     lambda: reduce(longest, numbers))
+        else:
+            tasks = (lambda: list(pmap(collatz_steps, numbers, pool=pool, workers=workers)),
+                     lambda: list(pfilter(is_long_chain, numbers, pool=pool, workers=workers)),
+                     lambda: preduce(longest, numbers, pool=pool, workers=workers))
+        get_pool(pool or 'thread', workers)  # start the pool outside the timings
+        times = []
+        results = []
+        for task in tasks:
+            start = time.perf_counter()
+            results.append(task())
+            times.append(time.perf_counter() - start)
+        expected = expected or results
+        check = "" if results == expected else "MISMATCH"
+        print("%-12s %10.3f %10.3f %10.3f  %s" % (label, times[0], times[1], times[2], check))
+    shutdown()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,153 @@
+# Lazy pipelines;
+# The map/filter/reduce examples in day4.py (and the squares and vec examples in day8.py) build a whole new list at
+# every step, so a chain of three steps over a million numbers holds two lists of a million elements on the way.
+# A Stream only remembers the steps:
+#
+#     total = Stream(range(10)).map(lambda x: x**2).filter(lambda x: x % 2).reduce(custom_sum)
+#
+# Nothing runs until a result is asked for with list(), to_list(), reduce() or write(). Then every element goes
+# through all the steps before the next one is read, so no list is built in between and the memory used stays the
+# same however long the input is. The steps are chained builtin map, filter and itertools objects, which do their
+# looping in C.
+# Every step returns a new Stream and leaves the old one as it was. A Stream over an iterator (a file, a generator)
+# can only be run once, like the iterator itself.
+
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+from functools import reduce
+
+missing = object()
+
+
+class Stream:
+    def __init__(self, iterable, steps=()):
+        self.iterable = iterable
+        self.steps = steps
+
+    def then(self, step):
+        return Stream(self.iterable, self.steps + (step,))
+
+    def map(self, func):
+        return self.then(lambda items: map(func, items))
+
+    def filter(self, func):
+        return self.then(lambda items: filter(func, items))
+
+    # Like [num for elem in vec for num in elem]
+    def flatten(self):
+        return self.then(itertools.chain.from_iterable)
+
+    def take(self, count):
+        return self.then(lambda items: itertools.islice(items, count))
+
+    # Lists of size consecutive elements; the last one may be shorter.
+    def chunk(self, size):
+        if size < 1:
+            raise ValueError("size must be at least 1, got %r" % size)
+        return self.then(lambda items: iter(lambda: list(itertools.islice(items, size)), []))
+
+    # func gets a list of up to size elements at a time and returns the results for all of them; useful for work that
+    # is cheaper in bulk, like a NumPy call or one database query for many keys.
+    def batch(self, func, size):
+        return self.chunk(size).map(func).flatten()
+
+    def __iter__(self):
+        items = iter(self.iterable)
+        for step in self.steps:
+            items = step(items)
+        return items
+
+    def to_list(self):
+        return list(self)
+
+    def reduce(self, func, initial=missing):
+        if initial is missing:
+            return reduce(func, self)
+        return reduce(func, self, initial)
+
+    # Writes one element per line and returns how many were written. file is a path or an open text file.
+    def write(self, file, format=str):
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'w') as opened:
+                return self.write(opened, format)
+        count = 0
+        # A few thousand lines per write() call, instead of one or two calls per line
+        for chunk in self.chunk(4096):
+            file.write('\n'.join(map(format, chunk)))
+            file.write('\n')
+            count += len(chunk)
+        return count
+
+
+# Usage;
+
+"""
+my_pets = ['alfred', 'tabitha', 'william', 'arla']
+print(Stream(my_pets).map(str.upper).to_list())
+
+scores = [66, 90, 68, 59, 76, 60, 88, 74, 81, 65]
+print(Stream(scores).filter(lambda score: score > 75).reduce(lambda first, second: first + second))
+
+vec = [[1, 2, 3], [4, 5, 6], [7, 8, 9]]
+print(Stream(vec).flatten().map(lambda x: x * 2).chunk(4).to_list())
+
+Stream(range(10 ** 9)).map(lambda x: x**2).take(1000).write('squares.txt')
+"""
+
+
+# Benchmark;
+# The day4/day8 style (a list per step) against a Stream, for the same square -> keep odd -> sum pipeline and for a
+# pipeline written to a file: time and peak memory traced by tracemalloc (measured in separate runs, since tracing
+# slows everything down).
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def benchmark(sizes=(10_000, 1_000_000, 10_000_000)):
+    def custom_sum(first, second):
+        return first + second
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'squares.txt')
+
+        def lists_sum():
+            squares = list(map(lambda x: x**2, range(n)))
+            odd = list(filter(lambda x: x % 2, squares))
+            return reduce(custom_sum, odd)
+
+        def stream_sum():
+            return Stream(range(n)).map(lambda x: x**2).filter(lambda x: x % 2).reduce(custom_sum)
+
+        def lists_write():
+            squares = list(map(lambda x: x**2, range(n)))
+            odd = list(filter(lambda x: x % 2, squares))
+            with open(path, 'w') as file:
+                file.writelines([str(x) + '\n' for x in odd])
+
+        def stream_write():
+            Stream(range(n)).map(lambda x: x**2).filter(lambda x: x % 2).write(path)
+
+        print("%-14s %12s %10s %12s" % ("pipeline", "elements", "seconds", "peak MB"))
+        for n in sizes:
+            results = []
+            for label, function in (('lists, sum', lists_sum), ('stream, sum', stream_sum),
+                                    ('lists, file', lists_write), ('stream, file', stream_write)):
+                elapsed, peak, result = measure(function)
+                results.append(result)
+                print("%-14s %12d %10.3f %12.2f" % (label, n, elapsed, peak / 2 ** 20))
+            assert results[0] == results[1]
+
+
+if __name__ == '__main__':
+    benchmark()
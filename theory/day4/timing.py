@@ -0,0 +1,197 @@
+# Timing decorator;
+# The decorators in day4.py wrap a function in new_function(*args, **kwds) but remember nothing about the calls.
+# timed, written in the style of type_check(correct_type), counts every call and every exception of the function and
+# measures how long the calls take with time.perf_counter_ns. The durations go into a histogram with HDR-style buckets:
+# each power of two is split into 2 ** SUB_BITS equal buckets, so every bucket is within about 12% of the durations
+# it holds, and recording a duration is a couple of integer operations.
+#
+#     @timed()                 # time every call
+#     @timed(every=16)         # time one call in 16, count all of them
+#
+# disable() turns every timed function into a plain pass-through (one flag check per call), enable() turns timing
+# back on, and snapshot() returns the numbers of all instrumented functions, under module.qualname (or the name given
+# to timed). Functions decorated while timing is disabled (for example with TIMING=0 in the environment) are not
+# wrapped at all and cost nothing.
+
+import os
+import time
+
+SUB_BITS = 3
+SUB_BUCKETS = 1 << SUB_BITS
+BUCKETS = 64 * SUB_BUCKETS
+
+enabled = os.environ.get('TIMING', '1') != '0'
+
+# module.qualname of the function (or the name given to timed) -> its CallStats. Functions of the same name in
+# different modules get an entry each.
+registry = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+# Durations below SUB_BUCKETS ns get a bucket each; above that, the bit length picks the power of two and the next
+# SUB_BITS bits pick the bucket inside it.
+
+def bucket_index(duration):
+    bits = duration.bit_length()
+    if bits <= SUB_BITS:
+        return duration
+    shift = bits - SUB_BITS - 1
+    return ((shift + 1) << SUB_BITS) + ((duration >> shift) - SUB_BUCKETS)
+
+
+def bucket_lowest(index):
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return (SUB_BUCKETS + (index & (SUB_BUCKETS - 1))) << shift
+
+
+class CallStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.timed = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def record(self, duration):
+        self.timed += 1
+        self.total_ns += duration
+        if duration > self.max_ns:
+            self.max_ns = duration
+        self.buckets[bucket_index(duration)] += 1
+
+    # Lower edge of the bucket holding the given fraction of the timed calls.
+
+    def percentile(self, fraction):
+        wanted = fraction * self.timed
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return bucket_lowest(index)
+        return 0
+
+    def snapshot(self):
+        return {'calls': self.calls,
+                'errors': self.errors,
+                'timed': self.timed,
+                'mean_ns': self.total_ns // self.timed if self.timed else 0,
+                'p50_ns': self.percentile(0.5),
+                'p90_ns': self.percentile(0.9),
+                'p99_ns': self.percentile(0.99),
+                'max_ns': self.max_ns,
+                'buckets': {bucket_lowest(index): count for index, count in enumerate(self.buckets) if count}}
+
+
+def timed(every=1, name=None):
+    if every < 1:
+        raise ValueError("every must be at least 1, got %r" % every)
+
+    def timer(old_function):
+        if not enabled:
+            return old_function
+        key = name or '%s.%s' % (old_function.__module__, old_function.__qualname__)
+        stats = registry[key] = CallStats(key)
+        buckets = stats.buckets
+        clock = time.perf_counter_ns
+
+        def new_function(*args, **kwds):
+            if not enabled:
+                return old_function(*args, **kwds)
+            stats.calls += 1
+            if stats.calls % every:
+                try:
+                    return old_function(*args, **kwds)
+                except BaseException:
+                    stats.errors += 1
+                    raise
+            start = clock()
+            try:
+                return old_function(*args, **kwds)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                # CallStats.record and bucket_index, inlined to save two calls
+                duration = clock() - start
+                stats.timed += 1
+                stats.total_ns += duration
+                if duration > stats.max_ns:
+                    stats.max_ns = duration
+                bits = duration.bit_length()
+                if bits <= SUB_BITS:
+                    buckets[duration] += 1
+                else:
+                    shift = bits - SUB_BITS - 1
+                    buckets[((shift + 1) << SUB_BITS) + (duration >> shift) - SUB_BUCKETS] += 1
+
+        new_function.stats = stats
+        new_function.__name__ = old_function.__name__
+        new_function.__doc__ = old_function.__doc__
+        return new_function
+    return timer
+
+
+def snapshot():
+    return {name: stats.snapshot() for name, stats in registry.items()}
+
+
+def reset():
+    for name in list(registry):
+        registry[name].__init__(name)
+
+
+# Usage;
+
+"""
+@timed()
+def times2(num):
+    return num*2
+
+
+times2(2)
+print(snapshot()['__main__.times2'])
+"""
+
+
+# Benchmark;
+# Cost the decorator adds to a call of an empty function: timing every call, one call in 16, and disabled.
+
+def benchmark(calls=1_000_000):
+    def empty(num):
+        return num
+
+    enable()
+    variants = [('plain', empty, True),
+                ('timed', timed(name='bench every call')(empty), True),
+                ('timed every=16', timed(every=16, name='bench every 16')(empty), True),
+                ('disabled', timed(name='bench disabled')(empty), False)]
+    baseline = None
+    for label, function, switch in variants:
+        if switch:
+            enable()
+        else:
+            disable()
+        start = time.perf_counter_ns()
+        for i in range(calls):
+            function(i)
+        per_call = (time.perf_counter_ns() - start) / calls
+        baseline = baseline if baseline is not None else per_call
+        print("%-15s %8.1f ns/call  overhead %8.1f ns" % (label, per_call, per_call - baseline))
+    enable()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,362 @@
+# Vectorized map, filter and reduce;
+# The nice exercise at the end of the map/filter/reduce part of day4.py calls a Python lambda once per element:
+#
+#     map(lambda x: round(x ** 2, 3), my_floats)
+#     filter(lambda name: len(name) <= 7, my_names)
+#     reduce(lambda num1, num2: num1 * num2, my_numbers)
+#
+# vmap, vfilter and vreduce take the same arguments, but first look at what the function does. When it is one of a
+# few common kernels (a power, round to n digits, a comparison with a number, a length comparison, a sum or a product)
+# the whole input is handled by a NumPy ufunc at once; anything else goes through the builtin as before.
+# The kernels are found by comparing the bytecode of the function with small template lambdas, so any function that
+# does the same thing is recognized, whatever its name and the names of its arguments:
+#
+#     def is_a_student(score):
+#         return score > 75               # same bytecode as the template lambda x: x > 0, with 75 instead of 0
+#
+# The results are the same as with the builtins, and a kernel that might not give the same answer (ints that could
+# overflow 64 bits, a round that is too close to a tie to trust) hands that input back to the Python path.
+# vmap and vfilter return a NumPy array when a kernel did the work (.tolist() turns it into the builtin's list) and the
+# builtin's list otherwise; vreduce returns a Python number. Only inputs that are all ints, all floats or all strings
+# (or NumPy arrays) are turned into arrays; anything else goes straight to the builtin.
+
+import dis
+import inspect
+import operator
+import time
+from functools import reduce
+
+import numpy as np
+
+# Comparison operators and the ufuncs doing the same.
+COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+               '==': np.equal, '!=': np.not_equal}
+
+# Reductions done in blocks, so the running value of a float sum or product needs no temporary of the input's size.
+BLOCK_SIZE = 1 << 16
+
+INT_LIMIT = 2 ** 63
+
+missing = object()
+
+
+# The bytecode of a function with everything that may differ between equivalent functions taken out: argument names
+# become argument numbers, and constants become placeholders whose values are returned separately.
+
+def code_shape(func):
+    shape = []
+    constants = []
+    for instruction in dis.get_instructions(func):
+        if instruction.opname in ('RESUME', 'NOP', 'CACHE'):
+            continue
+        if instruction.opname == 'LOAD_CONST':
+            constants.append(instruction.argval)
+            shape.append(('LOAD_CONST', type(instruction.argval)))
+        elif instruction.opname == 'LOAD_FAST':
+            shape.append(('LOAD_FAST', instruction.arg))
+        else:
+            shape.append((instruction.opname, instruction.argval))
+    return tuple(shape), constants
+
+
+# (kernel name, comparison symbol, template)
+KERNELS = [('power', None, lambda x: x ** 2),
+           ('round', None, lambda x: round(x, 3)),
+           ('round_power', None, lambda x: round(x ** 2, 3)),
+           ('add', None, lambda first, second: first + second),
+           ('multiply', None, lambda first, second: first * second),
+           ('compare', '<', lambda x: x < 0),
+           ('compare', '<=', lambda x: x <= 0),
+           ('compare', '>', lambda x: x > 0),
+           ('compare', '>=', lambda x: x >= 0),
+           ('compare', '==', lambda x: x == 0),
+           ('compare', '!=', lambda x: x != 0),
+           ('length', '<', lambda x: len(x) < 0),
+           ('length', '<=', lambda x: len(x) <= 0),
+           ('length', '>', lambda x: len(x) > 0),
+           ('length', '>=', lambda x: len(x) >= 0),
+           ('length', '==', lambda x: len(x) == 0),
+           ('length', '!=', lambda x: len(x) != 0)]
+
+# Shape of the code -> (kernel name, comparison symbol). A template written with an int constant also matches the
+# same function with a float constant.
+TEMPLATES = {}
+for name, symbol, template in KERNELS:
+    shape, _ = code_shape(template)
+    TEMPLATES[shape] = TEMPLATES[tuple(('LOAD_CONST', float) if step == ('LOAD_CONST', int) else step
+                                       for step in shape)] = (name, symbol)
+
+# Code object -> (kernel name, comparison symbol, constants), or None when it is no kernel.
+recognized = {}
+
+
+def recognize(func):
+    if func is operator.add:
+        return 'add', None, []
+    if func is operator.mul:
+        return 'multiply', None, []
+    code = getattr(func, '__code__', None)
+    if code is None or code.co_flags & (inspect.CO_VARARGS | inspect.CO_VARKEYWORDS):
+        return None
+    if code not in recognized:
+        shape, constants = code_shape(func)
+        found = TEMPLATES.get(shape)
+        recognized[code] = found + ([value for value in constants if value is not None],) if found else None
+    kernel = recognized[code]
+    # round and len must still be the builtins where the function looks them up
+    if kernel and kernel[0] in ('round', 'round_power', 'length'):
+        builtin = round if kernel[0] != 'length' else len
+        if func.__globals__.get(builtin.__name__, builtin) is not builtin:
+            return None
+    return kernel
+
+
+# The input as a list (or the array it already is), read once so generators work, and as an array when its elements
+# are all of one kind that NumPy holds exactly; None otherwise.
+
+def as_array(iterable):
+    if isinstance(iterable, np.ndarray):
+        return iterable, iterable
+    items = list(iterable)
+    if not items or set(map(type, items)) not in ({int}, {float}, {str}):
+        return items, None
+    try:
+        array = np.asarray(items)
+    except OverflowError:
+        return items, None
+    # NumPy strings end at the first of any trailing '\x00' characters, so those strings would come out shorter
+    if array.dtype.kind == 'U' and np.char.str_len(array).sum() != sum(map(len, items)):
+        return items, None
+    return items, array
+
+
+def is_int(values):
+    return values.dtype.kind in 'iu'
+
+
+def is_number(values):
+    return values.dtype.kind in 'iuf'
+
+
+def largest(values):
+    return int(np.abs(values).max()) if values.size else 0
+
+
+# Every kernel returns None when it cannot promise the builtin's result for this input.
+
+def power_kernel(values, exponent):
+    if not is_number(values) or not isinstance(exponent, int) or not 0 <= exponent <= 64:
+        return None
+    if is_int(values) and largest(values) ** exponent >= INT_LIMIT:
+        return None
+    if is_int(values):
+        return np.power(values, exponent)
+    # Python computes float powers with the C library's pow(), like np.float_power; np.power squares by x * x, which
+    # can be one bit off from it
+    with np.errstate(over='ignore'):
+        result = np.float_power(values, exponent)
+    # Python raises OverflowError where NumPy would give inf
+    if not np.all(np.isfinite(result[np.isfinite(values)])):
+        return None
+    return result
+
+
+# Python rounds the exact decimal value of the float; rint(x * 10 ** digits) / 10 ** digits gets the same float except
+# when x * 10 ** digits is so close to a tie that the rounding error of the multiplication matters. Those few elements
+# are redone with round() itself.
+
+def round_kernel(values, digits):
+    if not is_number(values):
+        return None
+    if np.ndim(digits) == 0:
+        groups = [(digits, slice(None))]
+    else:
+        if digits.size and (digits.min() < 0 or digits.max() > 15):
+            return None
+        groups = [(count, digits == count) for count in np.flatnonzero(np.bincount(digits, minlength=16))]
+    if is_int(values):
+        return None if any(count < 0 for count, where in groups) else values.copy()
+    result = np.empty(values.shape, dtype=np.float64)
+    for count, where in groups:
+        if not 0 <= count <= 15:
+            return None
+        part = values[where]
+        scaled = part * 10.0 ** count
+        if np.any(np.abs(scaled) >= 2.0 ** 52):
+            return None
+        rounded = np.rint(scaled) / 10.0 ** count
+        # The multiplication is off by at most |scaled| * 2 ** -53
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= np.abs(scaled) * 2.0 ** -50
+        if np.any(near_tie):
+            rounded[near_tie] = [round(value, int(count)) for value in part[near_tie].tolist()]
+        result[where] = rounded
+    return result
+
+
+def round_integer_kernel(values):
+    # round() without digits gives ints, rounding ties to even like np.rint
+    if not is_number(values):
+        return None
+    if is_int(values):
+        return values.copy()
+    if not np.all(np.isfinite(values)) or np.any(np.abs(values) >= 2.0 ** 62):
+        return None
+    return np.rint(values).astype(np.int64)
+
+
+def map_kernel(kernel, values):
+    name, symbol, constants = kernel
+    if name == 'power':
+        return power_kernel(values, constants[0])
+    if name in ('round', 'round_power') and not isinstance(constants[-1], int):
+        return None  # round() wants int digits
+    if name == 'round':
+        return round_kernel(values, constants[0])
+    if name == 'round_power':
+        powers = power_kernel(values, constants[0])
+        return None if powers is None else round_kernel(powers, constants[1])
+    return None
+
+
+def filter_kernel(kernel, values):
+    name, symbol, constants = kernel
+    if name == 'compare' and is_number(values):
+        # Python compares ints and floats exactly; NumPy turns both into float64 first
+        if isinstance(constants[0], int) and abs(constants[0]) >= 2 ** 53:
+            return None
+        if is_int(values) and isinstance(constants[0], float) and largest(values) > 2 ** 53:
+            return None
+        return COMPARISONS[symbol](values, constants[0])
+    if name == 'length' and values.dtype.kind == 'U':
+        return COMPARISONS[symbol](np.char.str_len(values), constants[0])
+    return None
+
+
+def vmap(func, *iterables):
+    inputs = [as_array(iterable) for iterable in iterables]
+    items = [listed for listed, array in inputs]
+    arrays = [array for listed, array in inputs]
+    if all(array is not None and array.ndim == 1 for array in arrays):
+        result = None
+        if func is round and len(arrays) == 1:
+            result = round_integer_kernel(arrays[0])
+        elif func is round and len(arrays) == 2 and is_int(arrays[1]) and is_number(arrays[0]):
+            # Like map(), stop at the end of the shorter input
+            size = min(len(arrays[0]), len(arrays[1]))
+            result = round_kernel(arrays[0][:size], arrays[1][:size])
+        elif len(arrays) == 1:
+            kernel = recognize(func)
+            if kernel:
+                result = map_kernel(kernel, arrays[0])
+        if result is not None:
+            return result
+    return list(map(func, *items))
+
+
+def vfilter(func, iterable):
+    items, values = as_array(iterable)
+    kernel = recognize(func) if values is not None and values.ndim == 1 else None
+    if kernel:
+        keep = filter_kernel(kernel, values)
+        if keep is not None:
+            return values[keep]
+    return list(filter(func, items))
+
+
+# Ints are added or multiplied in one call when the result surely fits in 64 bits (the order does not matter for
+# them). Floats are combined strictly left to right with np.add.accumulate, the same order as reduce(), so rounding
+# errors are the same too; np.sum would add them pairwise and could differ in the last digit.
+
+def reduce_kernel(name, values, initial):
+    # Narrower NumPy types wrap around (or round) at their own width in reduce(), so only 64-bit values are taken
+    if not is_number(values) or values.size == 0 or values.dtype.itemsize != 8:
+        return None
+    if initial is not missing:
+        if type(initial) not in (int, float) or abs(initial) >= 2 ** 53 or is_int(values) and type(initial) is float:
+            return None
+        values = np.concatenate((np.array([initial], dtype=values.dtype), values))
+    if is_int(values):
+        top = largest(values)
+        if name == 'add' and top * values.size < INT_LIMIT:
+            return int(values.sum())
+        if name == 'multiply' and not np.all(values):
+            return 0
+        if name == 'multiply' and np.sum(np.log2(np.abs(values))) < 62:
+            return int(values.prod())
+        return None
+    accumulate = np.add.accumulate if name == 'add' else np.multiply.accumulate
+    total = values[0]
+    with np.errstate(over='ignore', invalid='ignore'):
+        for start in range(1, values.size, BLOCK_SIZE):
+            total = accumulate(np.concatenate(([total], values[start:start + BLOCK_SIZE])))[-1]
+    return float(total)
+
+
+def vreduce(func, iterable, initial=missing):
+    items, values = as_array(iterable)
+    kernel = recognize(func) if values is not None and values.ndim == 1 else None
+    if kernel and kernel[0] in ('add', 'multiply'):
+        result = reduce_kernel(kernel[0], values, initial)
+        if result is not None:
+            return result
+    if initial is missing:
+        return reduce(func, items)
+    return reduce(func, items, initial)
+
+
+# Usage;
+
+"""
+my_floats = [4.35, 6.09, 3.25, 9.77, 2.16, 8.88, 4.59]
+my_names = ["olumide", "akinremi", "josiah", "temidayo", "omoseun"]
+my_numbers = [4, 6, 9, 23, 5]
+
+print(vmap(lambda x: round(x ** 2, 3), my_floats))
+print(vfilter(lambda name: len(name) <= 7, my_names))
+print(vreduce(lambda num1, num2: num1 * num2, my_numbers))
+
+circle_areas = [3.56773, 5.57668, 4.00914, 56.24241, 9.01344, 32.00013]
+print(vmap(round, circle_areas, range(1, 7)))
+"""
+
+
+# Benchmark;
+# Nanoseconds per element for the four exercises, builtin and vectorized, from 10 ** 3 up to 10 ** 7 elements
+# (powers=range(3, 9) goes up to 10 ** 8, which needs about 8 GB of memory). The builtin runs stop at python_limit
+# elements, where the lists alone take gigabytes.
+
+def benchmark(powers=range(3, 8), python_limit=10 ** 7):
+    rng = np.random.default_rng(0)
+    print("%-10s %12s %12s %12s" % ("exercise", "elements", "builtin ns", "numpy ns"))
+    for power in powers:
+        n = 10 ** power
+        floats = rng.uniform(0, 100, n).round(5)
+        names = np.array(["olumide", "akinremi", "josiah", "temidayo", "omoseun"])[rng.integers(0, 5, n)]
+        numbers = np.ones(n, dtype=np.int64)
+        numbers[rng.integers(0, n, 40)] = 2
+        digits = np.arange(n) % 6 + 1
+        exercises = [('map', lambda values: vmap(lambda x: round(x ** 2, 3), values),
+                      lambda values: list(map(lambda x: round(x ** 2, 3), values)), floats),
+                     ('filter', lambda values: vfilter(lambda name: len(name) <= 7, values),
+                      lambda values: list(filter(lambda name: len(name) <= 7, values)), names),
+                     ('reduce', lambda values: vreduce(lambda num1, num2: num1 * num2, values),
+                      lambda values: reduce(lambda num1, num2: num1 * num2, values), numbers),
+                     ('round', lambda values: vmap(round, values, digits),
+                      lambda values: list(map(round, values, digits.tolist())), floats)]
+        for label, vectorized, builtin, values in exercises:
+            vectorized(values[:10])  # recognize the function outside the timing
+            start = time.perf_counter_ns()
+            vectorized(values)
+            numpy_ns = (time.perf_counter_ns() - start) / n
+            builtin_ns = float('nan')
+            if n <= python_limit:
+                listed = values.tolist()
+                start = time.perf_counter_ns()
+                builtin(listed)
+                builtin_ns = (time.perf_counter_ns() - start) / n
+                del listed
+            print("%-10s %12d %12.1f %12.2f" % (label, n, builtin_ns, numpy_ns))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -115,6 +115,8 @@ Usage: thingy [OPTIONS]
 0,1,1,2,3,5,8,13,21,34,55,89,144,233,377,610,987,
 """
 
+# For a single, far away Fibonacci number see theory/day3/fibonacci.py, which does not walk the whole sequence.
+
 # Code that modifies a collection while iterating over that same collection can be tricky to get right.
 # Instead, it is usually more straight-forward to loop over a copy of the collection or to create a new collection:
 
@@ -35,6 +35,9 @@ for n in range(2, 10):
 9 equals 3 * 3
 """
 
+# This loop tries every x below n. sieve.py finds primes and smallest factors far faster with a segmented sieve.
+# sieve_parallel.py spreads the same sieve over several processes.
+
 # The pass statement does nothing. It can be used when a statement is required syntactically but the program requires
 # no action.
 
@@ -0,0 +1,154 @@
+# Segmented sieve;
+# The for/else loop in day6.py tries every x below n, so checking all numbers up to N takes about N ** 2 steps.
+# The Sieve of Eratosthenes crosses out the multiples of each prime instead. To go up to 10 ** 9 without an array
+# of a billion flags, the range is cut into segments: the primes up to sqrt(hi) are sieved once, and each segment of
+# a fixed size is sieved with them and thrown away before the next one, so memory depends on the segment size only.
+
+import math
+import time
+
+import numpy as np
+
+SEGMENT_SIZE = 1 << 20
+
+
+# Primes below limit, with a plain (unsegmented) sieve; used for the small base primes.
+
+def small_primes(limit):
+    if limit <= 2:
+        return np.array([], dtype=np.int64)
+    is_prime = np.ones(limit, dtype=bool)
+    is_prime[:2] = False
+    for p in range(2, math.isqrt(limit - 1) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = False
+    return np.flatnonzero(is_prime)
+
+
+# Base primes for a range ending at hi, i.e. every prime up to sqrt(hi - 1).
+
+def base_primes(hi):
+    return small_primes(math.isqrt(max(hi - 1, 0)) + 1)
+
+
+# First multiple of p inside [lo, ...) that is not p itself; smaller multiples were crossed out by smaller primes.
+
+def first_multiple(p, lo):
+    return max(p * p, (lo + p - 1) // p * p)
+
+
+# Yields (start, flags) for every segment of [lo, hi); flags[i] tells whether start + i is prime.
+
+def sieve_segments(lo, hi, segment=SEGMENT_SIZE, primes=None):
+    lo = max(lo, 0)
+    if primes is None:
+        primes = base_primes(hi)
+    for start in range(lo, hi, segment):
+        stop = min(start + segment, hi)
+        flags = np.ones(stop - start, dtype=bool)
+        flags[:max(0, 2 - start)] = False  # 0 and 1 are not primes
+        for p in primes:
+            p = int(p)
+            if p * p >= stop:
+                break
+            flags[first_multiple(p, start) - start::p] = False
+        yield start, flags
+
+
+# The primes of every segment as one NumPy array at a time; faster than primes() when you can work on arrays.
+
+def prime_blocks(lo, hi, segment=SEGMENT_SIZE):
+    for start, flags in sieve_segments(lo, hi, segment):
+        yield np.flatnonzero(flags) + start
+
+
+def primes(lo, hi, segment=SEGMENT_SIZE):
+    for block in prime_blocks(lo, hi, segment):
+        for p in block.tolist():
+            yield p
+
+
+def count_primes(lo, hi, segment=SEGMENT_SIZE):
+    return sum(int(np.count_nonzero(flags)) for start, flags in sieve_segments(lo, hi, segment))
+
+
+# Smallest prime factor of every number in [lo, hi), segment by segment; a prime is its own smallest factor.
+# 0 and 1 have no prime factor and get 0.
+
+def smallest_factors(lo, hi, segment=SEGMENT_SIZE):
+    lo = max(lo, 0)
+    primes = base_primes(hi)
+    for start in range(lo, hi, segment):
+        stop = min(start + segment, hi)
+        factors = np.zeros(stop - start, dtype=np.int64)
+        for p in primes:
+            p = int(p)
+            if p * p >= stop:
+                break
+            multiples = factors[first_multiple(p, start) - start::p]
+            multiples[multiples == 0] = p
+        unmarked = factors == 0
+        factors[unmarked] = np.arange(start, stop)[unmarked]
+        factors[:max(0, 2 - start)] = 0
+        yield start, factors
+
+
+def smallest_factor(n):
+    if n < 2:
+        raise ValueError("%d has no prime factors" % n)
+    primes = base_primes(n + 1)
+    divides = np.flatnonzero(n % primes == 0)
+    return int(primes[divides[0]]) if len(divides) else n
+
+
+# The same line the for/else loop in day6.py prints for n.
+
+def factor(n):
+    x = smallest_factor(n)
+    if x == n:
+        return "%d is a prime number" % n
+    return "%d equals %d * %d" % (n, x, n // x)
+
+
+# Usage;
+
+"""
+for n in range(2, 10):
+    print(factor(n))
+
+print(list(primes(10 ** 9, 10 ** 9 + 100)))
+"""
+
+
+# Benchmark;
+# Counting the primes below N with the nested loop from day6.py and with the segmented sieve.
+
+def nested_loop_count(hi):
+    count = 0
+    for n in range(2, hi):
+        for x in range(2, n):
+            if n % x == 0:
+                break
+        else:
+            count += 1
+    return count
+
+
+def benchmark(loop_sizes=(1_000, 10_000, 30_000), sieve_sizes=(10 ** 6, 10 ** 7, 10 ** 8, 10 ** 9)):
+    for hi in loop_sizes:
+        start = time.perf_counter()
+        expected = nested_loop_count(hi)
+        loop_time = time.perf_counter() - start
+        start = time.perf_counter()
+        assert count_primes(0, hi) == expected
+        sieve_time = time.perf_counter() - start
+        print("N=%-11d nested loop %9.4f s  sieve %9.4f s  speedup %8.1fx"
+              % (hi, loop_time, sieve_time, loop_time / sieve_time))
+    for hi in sieve_sizes:
+        start = time.perf_counter()
+        count = count_primes(0, hi)
+        print("N=%-11d sieve %9.4f s  (%d primes)" % (hi, time.perf_counter() - start, count))
+
+
+if __name__ == '__main__':
+    benchmark()
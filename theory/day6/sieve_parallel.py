@@ -0,0 +1,87 @@
+# Parallel segmented sieve;
+# The segments of sieve.py do not depend on each other, so [lo, hi) can be cut into disjoint ranges and sieved by a pool
+# of processes. The base primes up to sqrt(hi) are computed once in the parent and handed to every worker a single time
+# when it starts, and the workers only send back small results: a count, or the prime flags packed eight to a byte.
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sieve import base_primes, sieve_segments
+
+TASK_SIZE = 1 << 24
+SEGMENT_SIZE = 1 << 22
+
+# Set once in every worker by init_worker and only read afterwards.
+worker_primes = None
+
+
+def init_worker(primes):
+    global worker_primes
+    worker_primes = primes
+
+
+def count_range(bounds):
+    lo, hi = bounds
+    return sum(int(np.count_nonzero(flags)) for start, flags in sieve_segments(lo, hi, SEGMENT_SIZE, worker_primes))
+
+
+def bits_range(bounds):
+    lo, hi = bounds
+    return np.packbits(np.concatenate([flags for start, flags in sieve_segments(lo, hi, SEGMENT_SIZE, worker_primes)]))
+
+
+# TASK_SIZE is a multiple of 8, so the packed bytes of consecutive tasks line up and can simply be joined.
+
+def task_ranges(lo, hi, task=TASK_SIZE):
+    return [(start, min(start + task, hi)) for start in range(lo, hi, task)]
+
+
+def run(work, lo, hi, workers):
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(base_primes(hi),)) as pool:
+        return list(pool.map(work, task_ranges(lo, hi)))
+
+
+def parallel_count(lo, hi, workers=None):
+    return sum(run(count_range, lo, hi, workers))
+
+
+# Bit i of the result (most significant bit first, as np.packbits lays it out) tells whether lo + i is prime.
+
+def parallel_prime_bits(lo, hi, workers=None):
+    parts = run(bits_range, lo, hi, workers)
+    return np.concatenate(parts) if parts else np.array([], dtype=np.uint8)
+
+
+def unpack_primes(bits, lo, hi):
+    return np.flatnonzero(np.unpackbits(bits, count=hi - lo)) + lo
+
+
+# Usage;
+# ProcessPoolExecutor starts new processes, so scripts using this need the if __name__ == '__main__' guard.
+
+"""
+print(parallel_count(0, 10 ** 10))
+bits = parallel_prime_bits(10 ** 9, 10 ** 9 + 1000)
+print(unpack_primes(bits, 10 ** 9, 10 ** 9 + 1000))
+"""
+
+
+# Benchmark;
+# Wall-clock time for counting the primes below hi with 1 up to os.cpu_count() workers.
+
+def benchmark(hi=10 ** 10):
+    baseline = None
+    for workers in range(1, os.cpu_count() + 1):
+        start = time.perf_counter()
+        count = parallel_count(0, hi, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print("%2d workers  %9.3f s  speedup %5.2fx  (%d primes)" % (workers, elapsed, baseline / elapsed, count))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -103,6 +103,8 @@ squares = list(map(lambda x: x**2, range(10)))
 
 squares = [x**2 for x in range(10)]
 
+# Stream in day4/stream.py runs chains like this one lazily: Stream(range(10)).map(lambda x: x**2).to_list()
+
 # A list comprehension consists of brackets containing an expression followed
 # by a for clause, then zero or more for or if clauses. The result will be a
 # new list resulting from evaluating the expression in the context of the for
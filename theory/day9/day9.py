@@ -128,6 +128,8 @@ print(basket)
 True
 """
 
+# For more items than fit in memory, day3/sketches.py answers "in" with a Bloom filter and len() with a HyperLogLog.
+
 # Demonstrate set operations on unique letters from two words
 
 a = set('abracadabra')
@@ -165,6 +167,8 @@ a ^ b
 {'r', 'd', 'b', 'm', 'z', 'l'}
 """
 
+# Bitmap in day3/bitmap_sets.py supports the same -, |, & and ^ on compressed bitmaps of numbered members.
+
 # Similarly to list comprehensions, set comprehensions are also supported
 
 a = {x for x in 'abracadabra' if x not in 'abc'}